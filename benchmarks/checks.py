@@ -0,0 +1,385 @@
+# Kontrole równoważności: szybkie ścieżki (wektorowe, przyrostowe, zbiorcze, z cache)
+# porównywane z prostą implementacją referencyjną na danych z katalogu data/.
+# Kod wyjścia 1, gdy którakolwiek kontrola się nie powiedzie.
+#
+#   python -m PJF.benchmarks.checks
+#   python -m PJF.benchmarks.checks --only ledger_replay orderbook_match
+
+import argparse
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+import traceback
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from PJF.benchmarks.startup import cold_copy
+from PJF.models.backtest import run_backtest
+from PJF.models.batch import BatchSimulator
+from PJF.models.cache import DataCache
+from PJF.models.indicators import Indicators
+from PJF.models.market import DATA_DIR, Market, load_calendar, load_stocks
+from PJF.models.orderbook import BUY, LIMIT, SELL, STOP, Order, OrderBook
+from PJF.models.persistence import load_run, save_run
+from PJF.models.portfolio import Portfolio
+from PJF.models.simulator import Simulator
+from PJF.models.stock import from_day
+from PJF.models.trading_calendar import SESSIONS_PER_YEAR
+from PJF.models.transaction import positions_state
+
+
+class CheckFailed(Exception):
+    pass
+
+
+def expect(condition, message):
+    if not condition:
+        raise CheckFailed(message)
+
+
+def expect_close(actual, expected, tolerance, message):
+    # Tolerancja względna (bezwzględna dla wartości poniżej 1)
+    actual, expected = np.asarray(actual, dtype=float), np.asarray(expected, dtype=float)
+    expect(actual.shape == expected.shape, f"{message}: kształt {actual.shape} != {expected.shape}")
+    expect(
+        np.array_equal(np.isnan(actual), np.isnan(expected)),
+        f"{message}: różne położenie NaN",
+    )
+    diff = np.nanmax(np.abs(actual - expected) / np.maximum(np.abs(expected), 1.0), initial=0.0)
+    expect(diff <= tolerance, f"{message}: różnica {diff:.3g} > {tolerance:.0e}")
+
+
+class Context:
+    def __init__(self, args):
+        self.data_dir = args.data_dir
+        self.seed = args.seed
+        self.stocks = load_stocks(self.data_dir)
+        self.market = Market(self.stocks, load_calendar(self.data_dir))
+
+    def candidates(self, date):
+        # Spółki notowane w dniu date i do końca danych
+        market = self.market
+        di = market.date_index(date)
+        last = len(market.calendar) - 1
+        return [
+            name for name in market.tickers
+            if market.quoted[di, market.ticker_index[name]]
+            and market.last_index[market.ticker_index[name]] == last
+        ]
+
+    def portfolio(self, seed, date, positions=5, market=True):
+        # Losowy portfel z SL/TP względem ceny wejścia
+        rng = random.Random(seed)
+        portfolio = Portfolio(self.market if market else None)
+        for name in rng.sample(self.candidates(date), positions):
+            stock = self.stocks[name]
+            price = stock.get_price_on_date(date)
+            portfolio.buy(stock, 10, price, date)
+            portfolio.set_sl_tp(name, price * rng.uniform(0.6, 0.9), price * rng.uniform(1.2, 2.0))
+        return portfolio
+
+
+# ==========================================================
+
+CHECKS = {}
+
+
+def check(fn):
+    CHECKS[fn.__name__] = fn
+    return fn
+
+
+@check
+def batch_vs_simulator(ctx):
+    # BatchSimulator ma dawać dokładnie to samo co osobne przebiegi Simulator
+    start, end = datetime(2012, 1, 3), datetime(2016, 12, 30)
+    count = 20
+
+    separate = []
+    for k in range(count):
+        portfolio = ctx.portfolio(ctx.seed + k, start)
+        simulator = Simulator(portfolio)
+        simulator.start(start)
+        simulator.run_until(end)
+        separate.append(portfolio)
+
+    batch = BatchSimulator(ctx.market, {k: ctx.portfolio(ctx.seed + k, start) for k in range(count)})
+    batch.start(start, end)
+    batch.run_until()
+
+    for k, expected in enumerate(separate):
+        actual = batch.portfolio(k)
+        expect(np.array_equal(actual.history.days, expected.history.days), f"portfel {k}: dni historii")
+        expect(np.array_equal(actual.history.values, expected.history.values), f"portfel {k}: wartości historii")
+        for key, column in expected.ledger.to_arrays().items():
+            expect(np.array_equal(actual.ledger.to_arrays()[key], column), f"portfel {k}: dziennik {key}")
+        expect(actual.analytics.snapshot() == expected.analytics.snapshot(), f"portfel {k}: analityka")
+
+
+@check
+def indicators_vs_pandas(ctx):
+    # Okna przyrostowe kontra rolling z pandas na pełnych macierzach rynku
+    market = ctx.market
+    last = len(market.calendar) - 1
+    date = market.calendar.date(last)
+
+    indicators = Indicators(market)
+    for i in range(last - 400, last + 1):
+        indicators.seek(i)
+    frame = indicators.screen(date, max_stale=None)
+
+    close = pd.DataFrame(market.close, columns=market.tickers)
+    returns = close / close.shift(1) - 1
+    volume = pd.DataFrame(market.session_matrix("volume"), columns=market.tickers)
+    reference = pd.DataFrame({
+        "sma_short": close.rolling(20).mean().iloc[last],
+        "sma_long": close.rolling(50).mean().iloc[last],
+        "volatility": returns.rolling(20).std().iloc[last] * np.sqrt(SESSIONS_PER_YEAR),
+        "momentum": (close / close.shift(20) - 1).iloc[last],
+        "volume_ratio": (volume / volume.shift(1).rolling(20, min_periods=1).mean()).iloc[last],
+    }).loc[frame.index]
+
+    # Zmienność z przesuwanych sum kwadratów: szum rzędu 1e-15 w wariancji stałych
+    # kursów po pierwiastku daje ~1e-7
+    tolerance = {"volatility": 1e-6}
+    for column in reference:
+        expect_close(frame[column], reference[column], tolerance.get(column, 1e-8), column)
+
+    # Skok (przebudowa od zera) ma dawać to samo co kroki po jednej sesji
+    rebuilt = Indicators(market).screen(date, max_stale=None)
+    for column in reference:
+        expect_close(rebuilt[column], frame[column], tolerance.get(column, 1e-8), f"przebudowa: {column}")
+
+
+@check
+def analytics_vs_numpy(ctx):
+    # Akumulatory Welforda kontra numpy na zapisanych dziennych stopach zwrotu;
+    # ten sam wynik z Simulatora i z backtestu wektorowego
+    start = datetime(2012, 1, 3)
+    portfolio = ctx.portfolio(ctx.seed, start)
+    simulator = Simulator(portfolio)
+    simulator.start(start)
+    while not simulator.finished:
+        simulator.next_day()
+
+    analytics = portfolio.analytics
+    r = analytics.returns.values
+    expect(len(r) == analytics.n and len(r) > 2, "liczba stóp zwrotu")
+
+    growth = np.cumprod(1 + r)
+    excess = r - analytics.risk_free
+    downside = np.sqrt(np.mean(np.minimum(excess, 0) ** 2))
+    expect_close(analytics.volatility, np.std(r, ddof=1) * np.sqrt(SESSIONS_PER_YEAR), 1e-9, "zmienność")
+    expect_close(
+        analytics.sharpe, excess.mean() / np.std(r, ddof=1) * np.sqrt(SESSIONS_PER_YEAR), 1e-9, "Sharpe"
+    )
+    expect_close(analytics.sortino, excess.mean() / downside * np.sqrt(SESSIONS_PER_YEAR), 1e-9, "Sortino")
+    expect_close(analytics.growth - 1, growth[-1] - 1, 1e-9, "stopa zwrotu")
+    expect_close(
+        analytics.max_drawdown, (growth / np.maximum.accumulate(growth) - 1).min(), 1e-9, "obsunięcie"
+    )
+
+    attribution = analytics.attribution(portfolio.valuation)
+    expect_close(sum(a + b for a, b in attribution.values()), analytics.pnl, 1e-6, "atrybucja P&L")
+
+    replayed = ctx.portfolio(ctx.seed, start)
+    run_backtest(replayed, start, apply=True, calendar=ctx.market.calendar)
+    expected, actual = analytics.snapshot(), replayed.analytics.snapshot()
+    expect(actual.sessions == expected.sessions, "backtest: liczba sesji")
+    for field in ("total_return", "pnl", "volatility", "sharpe", "sortino", "max_drawdown"):
+        expect_close(getattr(actual, field), getattr(expected, field), 1e-6, f"backtest: {field}")
+    expect_close(replayed.history.values, portfolio.history.values, 1e-6, "backtest: historia")
+    expect(len(replayed.ledger) == len(portfolio.ledger), "backtest: dziennik")
+
+
+@check
+def orderbook_match(ctx):
+    # Księga posortowana po cenie kontra pełny przegląd wszystkich zleceń
+    rng = random.Random(ctx.seed)
+    stocks = [ctx.stocks[name] for name in ctx.market.tickers[:5]]
+
+    for _ in range(200):
+        book = OrderBook()
+        orders = []
+        for _ in range(rng.randint(1, 40)):
+            order = Order(
+                rng.choice(stocks), rng.choice((BUY, SELL)), rng.choice((LIMIT, STOP)),
+                round(rng.uniform(80, 120), 1), rng.randint(1, 10),
+            )
+            book.place(order)
+            orders.append(order)
+
+        stock = rng.choice(stocks)
+        open_ = rng.uniform(85, 115)
+        low, high = open_ - rng.uniform(0, 15), open_ + rng.uniform(0, 15)
+
+        expected = {}
+        for order in orders:
+            if order.stock is not stock:
+                continue
+            if order.triggers_below and low <= order.price:
+                expected[order.id] = min(open_, order.price)
+            elif not order.triggers_below and order.price <= high:
+                expected[order.id] = max(open_, order.price)
+
+        actual = {order.id: price for order, price in book.match(stock.name, open_, high, low)}
+        expect(actual == expected, f"realizacje {sorted(actual)} != {sorted(expected)}")
+        expect(len(book) == len(orders) - len(expected), "zlecenia po realizacji")
+
+    # Ścieżka z rynkiem (wiersze macierzy) i bez rynku (wyszukiwanie w Stock)
+    start = datetime(2012, 3, 5)
+    results = []
+    for market in (True, False):
+        portfolio = ctx.portfolio(ctx.seed, start, market=market)
+        for name in ctx.candidates(start)[:3]:
+            stock = ctx.stocks[name]
+            price = stock.get_price_on_date(start)
+            portfolio.place_order(stock, BUY, LIMIT, price * 0.9, 5)
+            portfolio.place_order(stock, BUY, STOP, price * 1.1, 3, good_till=datetime(2012, 6, 1))
+        simulator = Simulator(portfolio, ctx.market.calendar)
+        simulator.start(start)
+        fills = []
+        for _ in range(500):
+            simulator.next_day()
+            fills += simulator.last_fills
+        results.append((fills, portfolio.history.values.copy()))
+
+    (with_market, history), (without_market, history_stocks) = results
+    expect(len(with_market) > 0, "brak realizacji zleceń")
+    expect(with_market == without_market, "realizacje z rynkiem i bez rynku")
+    expect_close(history, history_stocks, 1e-6, "historia z rynkiem i bez rynku")
+
+
+@check
+def ledger_replay(ctx):
+    # Stan z dziennika (migawka + ogon, zmiany SL/TP) kontra stan zapamiętany w trakcie symulacji;
+    # zapis i wczytanie przebiegu nie zmieniają dalszej symulacji
+    rng = random.Random(ctx.seed)
+    market, stocks = ctx.market, ctx.stocks
+    start = datetime(2012, 3, 5)
+
+    portfolio = ctx.portfolio(ctx.seed, start, positions=6)
+    portfolio.ledger.snapshot_every = 8
+    names = list(portfolio.positions)
+    simulator = Simulator(portfolio)
+    simulator.start(start)
+
+    truth = {}
+    for _ in range(800):
+        simulator.next_day()
+        date = simulator.current_date
+        name = rng.choice(names)
+        if rng.random() < 0.1:
+            if name in portfolio.positions and rng.random() < 0.5:
+                portfolio.sell(name, rng.randint(1, portfolio.positions[name].shares), date=date)
+            elif market.has_quote_on_date(name, date):
+                portfolio.buy(stocks[name], rng.randint(1, 5), market.price_on_date(name, date), date)
+        if rng.random() < 0.2 and name in portfolio.positions:
+            price = market.price_on_date(name, date)
+            portfolio.set_sl_tp(name, price * 0.8, price * 1.3)
+        truth[date] = sorted(positions_state(portfolio.positions))
+
+    ledger = portfolio.ledger
+    expect(len(ledger.snapshots) > 2, "za mało migawek")
+    for date, state in truth.items():
+        expect(sorted(ledger.state_at(date)) == state, f"stan z dziennika {date:%Y-%m-%d}")
+
+    date = rng.choice(sorted(truth))
+    past = portfolio.at(date, stocks)
+    expect(sorted(positions_state(past.positions)) == truth[date], "Portfolio.at: pozycje")
+    expect(all(t.date <= date for t in past.ledger), "Portfolio.at: dziennik po dacie")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "run.npz")
+        save_run(path, portfolio, simulator)
+        loaded, resumed = load_run(path, stocks, market)
+
+    expect(loaded.analytics.snapshot() == portfolio.analytics.snapshot(), "wczytana analityka")
+    for _ in range(300):
+        simulator.next_day()
+        resumed.next_day()
+    expect(np.array_equal(loaded.history.days, portfolio.history.days), "wznowienie: dni historii")
+    expect_close(loaded.history.values, portfolio.history.values, 1e-6, "wznowienie: historia")
+    expect(
+        sorted(positions_state(loaded.positions)) == sorted(positions_state(portfolio.positions)),
+        "wznowienie: pozycje",
+    )
+
+
+@check
+def cache_invalidation(ctx):
+    # Cache .npy kontra bezpośrednie parsowanie CSV; zmiana pliku unieważnia wpis,
+    # a sam nowy czas modyfikacji (ta sama treść) – nie
+    source = cold_copy(ctx.data_dir)
+    copy = tempfile.mkdtemp(prefix="pjf-checks-")
+    try:
+        for f in sorted(os.listdir(source))[:3]:
+            shutil.copy2(os.path.join(source, f), copy)
+
+        cached = load_stocks(copy, processes=1)
+        parsed = load_stocks(copy, use_cache=False)
+        for name, stock in parsed.items():
+            expect(np.array_equal(cached[name].days, stock.days), f"{name}: dni z cache")
+            expect(np.array_equal(cached[name].close, stock.close), f"{name}: ceny z cache")
+
+        name = sorted(cached)[0]
+        csv_path = cached[name].csv_path
+        cache = DataCache(copy)
+        expect(cache.is_fresh(csv_path), "świeży wpis po zbudowaniu")
+
+        stat = os.stat(csv_path)
+        os.utime(csv_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        expect(DataCache(copy).is_fresh(csv_path), "sam czas modyfikacji unieważnił wpis")
+
+        day = from_day(cached[name].last_day + 7)
+        with open(csv_path, "a", encoding="utf-8") as f:
+            f.write(f"{day:%Y-%m-%d};1.0;2.0;0.5;1.5;100\n")
+        expect(not DataCache(copy).is_fresh(csv_path), "zmieniony plik nadal świeży")
+
+        reloaded = load_stocks(copy, processes=1)[name]
+        expect(reloaded.last_day == cached[name].last_day + 7, "nowy wiersz nie trafił do cache")
+        expect(reloaded.close[-1] == 1.5, "cena z nowego wiersza")
+        expect(load_calendar(copy).days[-1] == reloaded.last_day, "kalendarz bez nowej sesji")
+    finally:
+        shutil.rmtree(source)
+        shutil.rmtree(copy)
+
+
+# ==========================================================
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--data-dir", default=DATA_DIR)
+    parser.add_argument("--only", nargs="*", choices=sorted(CHECKS), default=None)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    ctx = Context(args)
+    failed = []
+    for name in args.only or CHECKS:
+        t = time.perf_counter()
+        try:
+            CHECKS[name](ctx)
+        except CheckFailed as e:
+            failed.append(name)
+            print(f"BŁĄD {name}: {e}")
+            continue
+        except Exception:
+            failed.append(name)
+            print(f"BŁĄD {name}:")
+            traceback.print_exc()
+            continue
+        print(f"OK   {name} ({time.perf_counter() - t:.1f} s)")
+
+    if failed:
+        print(f"\nniezgodności: {', '.join(failed)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+# Zimny start: wczytanie całego katalogu data/ bez cache – pętla szeregowa
+# (jak dawniej) kontra równoległe parsowanie w puli procesów.
+#
+#   python -m PJF.benchmarks.startup [--processes N] [--repeat K]
+
+import argparse
+import os
+import shutil
+import tempfile
+import time
+
+from PJF.models.market import DATA_DIR, load_stocks
+
+
+def cold_copy(data_dir):
+    # Kopia samych plików CSV – bez katalogu .cache, więc każde wczytanie jest zimne
+    target = tempfile.mkdtemp(prefix="pjf-startup-")
+    for f in os.listdir(data_dir):
+        if f.endswith(".csv"):
+            shutil.copy2(os.path.join(data_dir, f), target)
+    return target
+
+
+def _time_cold(data_dir, processes):
+    copy = cold_copy(data_dir)
+    try:
+        t = time.perf_counter()
+        stocks = load_stocks(copy, processes=processes)
+        return time.perf_counter() - t, len(stocks)
+    finally:
+        shutil.rmtree(copy)
+
+
+def _time_warm(data_dir):
+    load_stocks(data_dir)
+    t = time.perf_counter()
+    stocks = load_stocks(data_dir)
+    return time.perf_counter() - t, len(stocks)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--data-dir", default=DATA_DIR)
+    parser.add_argument("--processes", type=int, default=None)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    cases = [
+        ("zimny, szeregowo", lambda: _time_cold(args.data_dir, 1)),
+        ("zimny, równolegle", lambda: _time_cold(args.data_dir, args.processes)),
+        ("ciepły (cache)", lambda: _time_warm(args.data_dir)),
+    ]
+
+    for label, run in cases:
+        times = []
+        for _ in range(args.repeat):
+            seconds, count = run()
+            times.append(seconds)
+        print(f"{label:20s} {min(times):7.3f} s  ({count} spółek, najlepszy z {args.repeat})")
+
+
+if __name__ == "__main__":
+    main()
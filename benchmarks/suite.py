@@ -0,0 +1,297 @@
+# Benchmarki gorących ścieżek danych i symulacji – bez GUI, na katalogu data/.
+# Wyniki (czas, przepustowość, szczyt pamięci) porównywane są z zapisaną bazą.
+#
+#   python -m PJF.benchmarks.suite                      # pomiar + porównanie z baselines.json
+#   python -m PJF.benchmarks.suite --save               # zapis nowej bazy
+#   python -m PJF.benchmarks.suite --only simulator_next_day --repeat 5
+
+import argparse
+import gc
+import json
+import os
+import platform
+import random
+import resource
+import shutil
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime
+
+import numpy as np
+
+from PJF.benchmarks.startup import cold_copy
+from PJF.models.cache import DataCache
+from PJF.models.market import DATA_DIR, Market, load_calendar, load_stocks
+from PJF.models.portfolio import Portfolio
+from PJF.models.simulator import Simulator
+from PJF.models.stock import Stock, from_day
+from PJF.models.trading_calendar import SESSIONS_PER_YEAR
+
+
+BASELINES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines.json")
+
+
+class Context:
+    # Wspólne, niemierzone przygotowanie: spółki z ciepłego cache, rynek, losowe zapytania
+    def __init__(self, args):
+        self.data_dir = args.data_dir
+        self.positions = args.positions
+        self.years = args.years
+        self.lookups = args.lookups
+        self.csv_files = args.csv_files
+        self.rng = random.Random(args.seed)
+
+        self.paths = sorted(
+            os.path.join(self.data_dir, f) for f in os.listdir(self.data_dir) if f.endswith(".csv")
+        )
+        self.stocks = load_stocks(self.data_dir)
+        self._market = None
+        self._queries = None
+
+    @property
+    def market(self):
+        if self._market is None:
+            self._market = Market(self.stocks, load_calendar(self.data_dir))
+        return self._market
+
+    def queries(self):
+        # (spółka, data) w zakresie notowań spółki – także dni bez sesji
+        if self._queries is None:
+            stocks = [s for s in self.stocks.values() if s.rows]
+            self._queries = []
+            for _ in range(self.lookups):
+                stock = self.rng.choice(stocks)
+                day = self.rng.randint(stock.first_day, stock.last_day)
+                self._queries.append((stock, from_day(day)))
+        return self._queries
+
+    def portfolio(self):
+        # N spółek z najdłuższą historią, notowanych w dniu startu; start tak, by
+        # zostało `years` lat sesji
+        market = self.market
+        start_index = max(len(market.calendar) - self.years * SESSIONS_PER_YEAR - 1, 0)
+        start = market.calendar.date(start_index)
+
+        quoted = [
+            name for name in market.tickers
+            if market.has_quote(start_index, market.ticker_index[name])
+            and market.last_index[market.ticker_index[name]] == len(market.calendar) - 1
+        ]
+        quoted.sort(key=lambda name: -self.stocks[name].rows)
+
+        portfolio = Portfolio(market)
+        for name in quoted[:self.positions]:
+            stock = self.stocks[name]
+            price = stock.get_price_on_date(start)
+            portfolio.buy(stock, 10, price, start)
+            portfolio.set_sl_tp(name, price * 0.7, price * 1.5)
+        return portfolio, start
+
+
+# ==========================================================
+# Przypadki: menedżer kontekstu przygotowuje dane (poza pomiarem)
+# i zwraca funkcję mierzoną, która oddaje liczbę wykonanych operacji.
+
+CASES = {}
+
+
+def case(unit):
+    def register(fn):
+        CASES[fn.__name__] = (contextmanager(fn), unit)
+        return fn
+    return register
+
+
+@case("spółek")
+def stock_init_cache(ctx):
+    cache = DataCache(ctx.data_dir)
+    yield lambda: len([Stock(os.path.basename(p), p, cache) for p in ctx.paths])
+
+
+@case("spółek")
+def stock_init_csv(ctx):
+    paths = ctx.paths[:ctx.csv_files]
+    yield lambda: len([Stock(os.path.basename(p), p) for p in paths])
+
+
+@case("zapytań")
+def get_price_on_date(ctx):
+    queries = ctx.queries()
+
+    def run():
+        for stock, date in queries:
+            stock.get_price_on_date(date)
+        return len(queries)
+
+    yield run
+
+
+@case("zapytań")
+def has_quote_on_date(ctx):
+    queries = ctx.queries()
+
+    def run():
+        for stock, date in queries:
+            stock.has_quote_on_date(date)
+        return len(queries)
+
+    yield run
+
+
+@case("dni")
+def total_value(ctx):
+    portfolio, start = ctx.portfolio()
+    calendar = ctx.market.calendar
+    dates = [calendar.date(i) for i in range(calendar.index_of(start) + 1, len(calendar))]
+
+    def run():
+        for date in dates:
+            portfolio.total_value(date)
+        return len(dates)
+
+    yield run
+
+
+@case("sesji")
+def simulator_next_day(ctx):
+    portfolio, start = ctx.portfolio()
+    simulator = Simulator(portfolio)
+    simulator.start(start)
+
+    def run():
+        steps = 0
+        while not simulator.finished:
+            simulator.next_day()
+            steps += 1
+        return steps
+
+    yield run
+
+
+@case("spółek")
+def load_stocks_cold(ctx):
+    copy = cold_copy(ctx.data_dir)
+    try:
+        yield lambda: len(load_stocks(copy))
+    finally:
+        shutil.rmtree(copy)
+
+
+@case("spółek")
+def load_stocks_warm(ctx):
+    load_stocks(ctx.data_dir)
+    yield lambda: len(load_stocks(ctx.data_dir))
+
+
+# ==========================================================
+
+def measure(ctx, name, repeat):
+    setup, unit = CASES[name]
+    times = []
+    ops = 0
+
+    for _ in range(repeat):
+        with setup(ctx) as run:
+            gc.collect()
+            t = time.perf_counter()
+            ops = run()
+            times.append(time.perf_counter() - t)
+
+    # Pamięć w osobnym przebiegu – tracemalloc spowalnia alokacje i zafałszowałby czasy
+    with setup(ctx) as run:
+        gc.collect()
+        tracemalloc.start()
+        run()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    seconds = min(times)
+    return {
+        "seconds": seconds,
+        "ops": ops,
+        "unit": unit,
+        "ops_per_s": ops / seconds if seconds > 0 else float("inf"),
+        "peak_bytes": peak,
+    }
+
+
+def compare(results, baseline, threshold):
+    # Regresja: czas gorszy od bazy o więcej niż threshold (względnie)
+    regressions = []
+    for name, result in results.items():
+        base = baseline.get(name)
+        if base is None:
+            result["change"] = None
+            continue
+        result["change"] = result["seconds"] / base["seconds"] - 1
+        if result["change"] > threshold:
+            regressions.append(name)
+    return regressions
+
+
+def report(results):
+    print(f"{'przypadek':22s} {'czas [s]':>10s} {'przepustowość':>22s} {'pamięć [MB]':>12s} {'vs baza':>9s}")
+    for name, r in results.items():
+        throughput = f"{r['ops_per_s']:,.0f} {r['unit']}/s"
+        change = r.get("change")
+        change_text = "—" if change is None else f"{change:+.1%}"
+        print(
+            f"{name:22s} {r['seconds']:10.4f} {throughput:>22s} "
+            f"{r['peak_bytes'] / 2**20:12.2f} {change_text:>9s}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--data-dir", default=DATA_DIR)
+    parser.add_argument("--only", nargs="*", choices=sorted(CASES), default=None)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--positions", type=int, default=20)
+    parser.add_argument("--years", type=int, default=10)
+    parser.add_argument("--lookups", type=int, default=100_000)
+    parser.add_argument("--csv-files", type=int, default=25)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--baseline", default=BASELINES)
+    parser.add_argument("--save", action="store_true", help="zapisz wyniki jako nową bazę")
+    parser.add_argument("--threshold", type=float, default=0.10)
+    args = parser.parse_args()
+
+    ctx = Context(args)
+    results = {name: measure(ctx, name, args.repeat) for name in (args.only or CASES)}
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)["results"]
+    regressions = compare(results, baseline, args.threshold)
+
+    report(results)
+    # ru_maxrss na Linuksie w KB
+    print(f"\nszczyt RSS procesu: {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:.1f} MB")
+
+    if args.save:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump({
+                "meta": {
+                    "date": datetime.now().isoformat(timespec="seconds"),
+                    "python": platform.python_version(),
+                    "numpy": np.__version__,
+                    "machine": platform.machine(),
+                    "cpus": os.cpu_count(),
+                    "args": {k: v for k, v in vars(args).items() if k not in ("save", "baseline", "data_dir")},
+                },
+                "results": {
+                    **baseline,
+                    **{name: {k: v for k, v in r.items() if k != "change"} for name, r in results.items()},
+                },
+            }, f, indent=2, ensure_ascii=False)
+        print(f"zapisano bazę: {args.baseline}")
+    elif regressions:
+        print(f"regresje (> {args.threshold:.0%}): {', '.join(regressions)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
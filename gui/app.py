@@ -1,104 +1,116 @@
 import os
 import sys
-import time
+from bisect import bisect_left
 from datetime import datetime
 
-from PyQt6.QtCore import QDate, QTimer
+from PyQt6.QtCore import QDate, QThread, QTimer, Qt, pyqtSignal
 from PyQt6.QtWidgets import (
     QWidget, QLabel, QLineEdit, QPushButton,
     QVBoxLayout, QComboBox, QMessageBox,
-    QTextEdit, QDateEdit
+    QTableView, QDateEdit, QProgressBar, QCompleter, QCheckBox, QFileDialog
 )
 
-from PJF.models.plotter import plot_portfolio, plot_stock
+from PJF.models.market import Market
+from PJF.gui.portfolio_model import PortfolioTableModel, roi, roi_color
+from PJF.gui.ticker_model import ListedTickersModel
+from PJF.gui.worker import SimulationWorker, StockLoader
+from PJF.models.plotter import plot_portfolio_series, plot_stock_series
 from PJF.models.portfolio import Portfolio
+from PJF.models.profiler import profiler
 from PJF.models.simulator import Simulator
-from PJF.models.stock import Stock
 
 
 class GPWSimulatorApp(QWidget):
-    def update_company_box_for_current_date(self):
-
-        if self.company_popup_open:
+    # Polecenia dla wątku symulacji (połączenia kolejkowane)
+    start_simulation = pyqtSignal(int)
+    simulation_interval = pyqtSignal(int)
+    simulation_changed = pyqtSignal()
+    run_until_requested = pyqtSignal(object)
+    skip_requested = pyqtSignal(int)
+    load_requested = pyqtSignal()
+
+    def update_company_box_for_current_date(self, date=None):
+        # Model listy filtruje się sam i tylko przy debiutach / wycofaniach;
+        # jeśli bieżąca spółka zniknie z listy, combo wybierze inną (change_stock)
+        if self.company_model is None or date is None:
             return
-
-        previous = self.company_box.currentText()
-
-        self.company_box.blockSignals(True)
-        self.company_box.clear()
-
-        # jeśli symulacja jeszcze nie ruszyła → pokazujemy wszystkie
-        if self.simulator.current_date is None:
-            companies = sorted(self.stocks.keys())
-        else:
-            date = self.simulator.current_date
-            companies = [
-                name for name, stock in self.stocks.items()
-                if stock.has_quote_on_date(date)
-            ]
-            companies.sort()
-
-        self.company_box.addItems(companies)
-
-        if previous in companies:
-            self.company_box.setCurrentText(previous)
-            self.current_stock = self.stocks[previous]
-        elif companies:
-            self.company_box.setCurrentText(companies[0])
-            self.current_stock = self.stocks[companies[0]]
-
-        self.company_box.blockSignals(False)
-
-    def _company_popup_show(self):
-        self.company_popup_open = True
-        QComboBox.showPopup(self.company_box)
-
-    def _company_popup_hide(self):
-        self.company_popup_open = False
-        QComboBox.hidePopup(self.company_box)
+        self.company_model.set_date_index(self.market.date_index(date))
 
     def __init__(self):
-        self.last_plot_update = 0
-        self.plot_update_interwal = 0.5
-        self.company_popup_open = False
+        self.plot_update_interwal = 1 / 30
         super().__init__()
         self.setWindowTitle("Symulator GPW")
         self.resize(700, 750)
 
+        # Rynek, portfel i symulator powstają dopiero po wczytaniu danych (on_stocks_loaded)
         self.stocks = {}
-        self.load_stocks()
-
-        self.portfolio = Portfolio()
-        self.simulator = Simulator(self.portfolio)
-
-        # ===== TIMER =====
-        self.timer = QTimer()
-        self.timer.setInterval(10_000)
-        self.timer.timeout.connect(self.auto_next_day)
-
+        self.current_stock = None
+        self.market = None
+        self.portfolio = None
+        self.simulator = None
+        self.worker = None
+        self.worker_thread = None
+
+        self.current_date = None     # data ostatnio narysowanej migawki
+        self.snapshot = None
+        self.pending_snapshot = None
+
+        self.frame_timer = QTimer()
+        self.frame_timer.setInterval(int(self.plot_update_interwal * 1000))
+        self.frame_timer.timeout.connect(self.render_pending)
+
+        self.speed = 10_000
         self.simulation_speeds = {
             "1x": 10_000,
             "5x": 2_000,
             "10x": 1_000,
             "50x": 200,
+            "max": 0,
         }
 
         self.speed_1x_btn = QPushButton("1x")
         self.speed_5x_btn = QPushButton("5x")
         self.speed_10x_btn = QPushButton("10x")
         self.speed_50x_btn = QPushButton("50x")
+        self.speed_max_btn = QPushButton("Max")
 
         self.speed_1x_btn.clicked.connect(lambda: self.set_speed("1x"))
         self.speed_5x_btn.clicked.connect(lambda: self.set_speed("5x"))
         self.speed_10x_btn.clicked.connect(lambda: self.set_speed("10x"))
         self.speed_50x_btn.clicked.connect(lambda: self.set_speed("50x"))
+        self.speed_max_btn.clicked.connect(lambda: self.set_speed("max"))
+
+        # ===== PROFILOWANIE =====
+        self.profile_box = QCheckBox("Profilowanie taktów")
+        self.profile_box.toggled.connect(self.set_profiling)
+        self.profile_view = QLabel()
+        self.profile_view.hide()
+        self.trace_btn = QPushButton("Zapisz ślad (Chrome trace)")
+        self.trace_btn.clicked.connect(self.export_trace)
+        self.trace_btn.hide()
+
+        self.profile_timer = QTimer()
+        self.profile_timer.setInterval(1000)
+        self.profile_timer.timeout.connect(self.show_profile)
+
+        self.jump_picker = QDateEdit()
+        self.jump_picker.setCalendarPopup(True)
+        self.jump_picker.setDisplayFormat("yyyy-MM-dd")
+
+        self.jump_btn = QPushButton("Przewiń do daty")
+        self.jump_btn.clicked.connect(self.jump_to_date)
+
+        self.skip_input = QLineEdit()
+        self.skip_input.setPlaceholderText("Liczba sesji")
+
+        self.skip_btn = QPushButton("Pomiń sesje")
+        self.skip_btn.clicked.connect(self.skip_sessions)
 
         # ===== WIDGETY =====
         self.company_box = QComboBox()
         self.company_box.setEditable(True)
-        self.company_box.showPopup = self._company_popup_show
-        self.company_box.hidePopup = self._company_popup_hide
-
+        self.company_box.setInsertPolicy(QComboBox.InsertPolicy.NoInsert)
+        self.company_model = None
 
         self.shares_input = QLineEdit()
         self.shares_input.setPlaceholderText("Ilość akcji")
@@ -122,26 +134,47 @@ class GPWSimulatorApp(QWidget):
         self.sell_btn = QPushButton("Sprzedaj")
         self.sell_btn.clicked.connect(self.sell)
 
-        self.portfolio_view = QTextEdit()
-        self.portfolio_view.setReadOnly(True)
+        self.portfolio_model = PortfolioTableModel(self)
+        self.portfolio_view = QTableView()
+        self.portfolio_view.setModel(self.portfolio_model)
+        self.portfolio_view.verticalHeader().hide()
+        self.portfolio_view.horizontalHeader().setStretchLastSection(True)
+
+        self.portfolio_summary = QLabel()
 
-        self.company_box.addItems(sorted(self.stocks.keys()))
         self.company_box.currentTextChanged.connect(self.change_stock)
 
-        # ustawiamy pierwszą spółkę ręcznie
-        first = next(iter(self.stocks))
-        self.company_box.setCurrentText(first)
-        self.current_stock = self.stocks[first]
-        self.update_date_range()
+        self.load_progress = QProgressBar()
+        self.load_progress.setFormat("Wczytywanie spółek: %v / %m")
+
+        # Do czasu wczytania danych nie ma rynku ani symulatora
+        self.market_controls = [
+            self.buy_btn, self.sell_btn, self.set_orders_btn, self.jump_btn, self.skip_btn
+        ]
+        for widget in self.market_controls:
+            widget.setEnabled(False)
 
         # ===== LAYOUT =====
         layout = QVBoxLayout()
 
+        layout.addWidget(self.load_progress)
+
         layout.addWidget(QLabel("Prędkość symulacji:"))
         layout.addWidget(self.speed_1x_btn)
         layout.addWidget(self.speed_5x_btn)
         layout.addWidget(self.speed_10x_btn)
         layout.addWidget(self.speed_50x_btn)
+        layout.addWidget(self.speed_max_btn)
+
+        layout.addWidget(self.profile_box)
+        layout.addWidget(self.profile_view)
+        layout.addWidget(self.trace_btn)
+
+        layout.addWidget(QLabel("Przewijanie:"))
+        layout.addWidget(self.jump_picker)
+        layout.addWidget(self.jump_btn)
+        layout.addWidget(self.skip_input)
+        layout.addWidget(self.skip_btn)
 
         layout.addWidget(QLabel("Spółka:"))
         layout.addWidget(self.company_box)
@@ -165,30 +198,99 @@ class GPWSimulatorApp(QWidget):
 
         layout.addWidget(QLabel("Portfel:"))
         layout.addWidget(self.portfolio_view)
+        layout.addWidget(self.portfolio_summary)
 
         self.setLayout(layout)
 
-        # Ustawiamy bieżącą spółkę
-        if not self.stocks:
-            QMessageBox.critical(self, "Błąd", "Brak danych w folderze data/")
-            sys.exit(1)
+        # PJF_PROFILE=1 – profilowanie od startu
+        if os.environ.get("PJF_PROFILE"):
+            self.profile_box.setChecked(True)
 
-        self.update_company_box_for_current_date()
-        self.update_date_range()
+        self.load_stocks()
     # ==========================================================
 
     def load_stocks(self):
-        base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-        data_dir = os.path.join(base_dir, "data")
+        # Pliki są parsowane w tle (w puli procesów), a okno od razu się pokazuje;
+        # spółki trafiają do listy w miarę wczytywania
+        self.loader = StockLoader()
+        self.loader_thread = QThread()
+        self.loader.moveToThread(self.loader_thread)
+
+        self.load_requested.connect(self.loader.run)
+        self.loader.stock_loaded.connect(self.on_stock_loaded)
+        self.loader.loaded.connect(self.on_stocks_loaded)
+        self.loader.failed.connect(self.on_load_failed)
+        self.loader_thread.start()
+        self.load_requested.emit()
+
+    def on_stock_loaded(self, stock, done, total):
+        self.load_progress.setMaximum(total)
+        self.load_progress.setValue(done)
+
+        self.stocks[stock.name] = stock
+        names = [self.company_box.itemText(i) for i in range(self.company_box.count())]
+        # pierwsza dodana spółka ustawia się jako bieżąca (change_stock)
+        self.company_box.insertItem(bisect_left(names, stock.name), stock.name)
+
+    def on_stocks_loaded(self, stocks, calendar):
+        self.loader_thread.quit()
+        self.load_progress.hide()
+
+        if not stocks:
+            QMessageBox.critical(self, "Błąd", "Brak danych w folderze data/")
+            sys.exit(1)
+
+        self.stocks = stocks
+        self.market = Market(self.stocks, calendar)
+        self.set_company_model(ListedTickersModel(self.market, self))
+        self.portfolio = Portfolio(self.market)
+        self.simulator = Simulator(self.portfolio)
+        self.start_worker()
 
-        if not os.path.exists(data_dir):
-            raise FileNotFoundError(f"Nie znaleziono katalogu danych: {data_dir}")
+        for widget in self.market_controls:
+            widget.setEnabled(True)
+
+        self.update_date_range()
 
-        for f in os.listdir(data_dir):
-            if f.endswith(".csv"):
-                name = f.replace(".csv", "").replace("_", " ")
-                path = os.path.join(data_dir, f)
-                self.stocks[name] = Stock(name, path)
+    def set_company_model(self, model):
+        # Lista wczytywana w tle zostaje zastąpiona modelem rynku (bez zmiany wyboru)
+        current = self.company_box.currentText()
+        self.company_box.blockSignals(True)
+        self.company_box.setModel(model)
+        self.company_box.setCurrentText(current)
+        self.company_box.blockSignals(False)
+        self.company_model = model
+
+        # Wyszukiwanie po fragmencie nazwy, bez względu na wielkość liter
+        completer = QCompleter(model, self)
+        completer.setFilterMode(Qt.MatchFlag.MatchContains)
+        completer.setCaseSensitivity(Qt.CaseSensitivity.CaseInsensitive)
+        completer.setCompletionMode(QCompleter.CompletionMode.PopupCompletion)
+        self.company_box.setCompleter(completer)
+
+    def on_load_failed(self, message):
+        self.loader_thread.quit()
+        QMessageBox.critical(self, "Błąd", message)
+        sys.exit(1)
+
+    def start_worker(self):
+        # ===== WĄTEK SYMULACJI =====
+        # Symulacja działa w osobnym wątku i publikuje niezmienne migawki dnia;
+        # GUI rysuje najwyżej jedną (najnowszą) migawkę na klatkę.
+        self.worker = SimulationWorker(self.simulator)
+        self.worker_thread = QThread()
+        self.worker.moveToThread(self.worker_thread)
+
+        self.start_simulation.connect(self.worker.start)
+        # timer symulacji zatrzymujemy w jego własnym wątku, tuż przed końcem wątku
+        self.worker_thread.finished.connect(self.worker.stop)
+        self.simulation_interval.connect(self.worker.set_interval)
+        self.simulation_changed.connect(self.worker.wake)
+        self.run_until_requested.connect(self.worker.run_until)
+        self.skip_requested.connect(self.worker.skip)
+        self.worker.snapshot_ready.connect(self.on_snapshot)
+        self.worker_thread.start()
+        self.frame_timer.start()
 
     # ==========================================================
 
@@ -197,21 +299,25 @@ class GPWSimulatorApp(QWidget):
             return
         self.current_stock = self.stocks[name]
         self.update_date_range()
-        self.redraw_charts()
+        if self.snapshot is not None:
+            self.redraw_charts(self.snapshot)
 
     # ==========================================================
 
     def update_date_range(self):
-        first = self.current_stock.data.iloc[0]["date"].date()
-        last = self.current_stock.data.iloc[-1]["date"].date()
+        if self.current_stock is None:
+            return
 
-        if self.simulator.current_date is None:
+        first = self.current_stock.first_date.date()
+        last = self.current_stock.last_date.date()
+
+        if self.current_date is None:
             self.date_picker.setMinimumDate(QDate(first.year, first.month, first.day))
             self.date_picker.setMaximumDate(QDate(last.year, last.month, last.day))
             self.date_picker.setDate(QDate(first.year, first.month, first.day))
             self.date_picker.setEnabled(True)
         else:
-            cd = self.simulator.current_date
+            cd = self.current_date
             qd = QDate(cd.year, cd.month, cd.day)
             self.date_picker.setMinimumDate(qd)
             self.date_picker.setMaximumDate(qd)
@@ -220,54 +326,53 @@ class GPWSimulatorApp(QWidget):
 
     # ==========================================================
 
-    def redraw_charts(self):
-        now = time.time()
-        if now - self.last_plot_update < self.plot_update_interwal:
-            return
-
-        self.last_plot_update = now
-
-        plot_portfolio(self.portfolio, self.simulator)
+    def redraw_charts(self, snapshot):
+        plot_portfolio_series(snapshot.history_days, snapshot.history_values)
 
-        for name, position in self.portfolio.positions.items():
-            plot_stock(position, self.simulator)
+        for stock, first_buy_date in snapshot.charts:
+            plot_stock_series(stock, first_buy_date, snapshot.date)
 
     # ==========================================================
 
-    def is_weekend(self, date: datetime):
-        return date.weekday() >= 5
-
-    # ==========================================================
+    def quote_problem(self, date):
+        if not self.market.calendar.is_session(date):
+            return "GPW zamknięta", "Brak sesji tego dnia."
+        if not self.market.has_quote_on_date(self.current_stock.name, date):
+            return "Brak notowań", "Spółka nie była notowana tego dnia."
+        return None
 
     def buy(self):
         try:
             shares = int(self.shares_input.text())
 
-            if self.simulator.current_date is None:
-                qd = self.date_picker.date()
-                date = datetime(qd.year(), qd.month(), qd.day())
-            else:
+            # Stan portfela zmieniamy tylko pod blokadą wątku symulacji
+            with self.worker.lock:
                 date = self.simulator.current_date
-
-            if self.is_weekend(date):
-                QMessageBox.warning(self, "GPW zamknięta", "Weekend – brak sesji.")
+                started = date is not None
+                if not started:
+                    qd = self.date_picker.date()
+                    date = datetime(qd.year(), qd.month(), qd.day())
+
+                problem = self.quote_problem(date)
+                if problem is None:
+                    price = self.market.price_on_date(self.current_stock.name, date)
+                    self.portfolio.buy(self.current_stock, shares, price, date)
+
+                    if started:
+                        self.simulator.recalculate_max_date()
+                    else:
+                        self.simulator.start(date)
+                    snapshot = self.worker.snapshot()
+
+            if problem is not None:
+                QMessageBox.warning(self, *problem)
                 return
 
-            if not self.current_stock.has_quote_on_date(date):
-                QMessageBox.warning(self, "Brak notowań", "Spółka nie była notowana tego dnia.")
-                return
-
-            price = self.current_stock.get_price_on_date(date)
-            self.portfolio.buy(self.current_stock, shares, price, date)
-
-            if self.simulator.current_date is None:
-                self.simulator.start(date)
-                self.timer.start()
-
-            self.update_date_range()
-            self.update_company_box_for_current_date()
-            self.refresh()
-            self.redraw_charts()
+            if started:
+                self.simulation_changed.emit()
+            else:
+                self.start_simulation.emit(self.speed)
+            self.render(snapshot)
 
         except Exception as e:
             QMessageBox.critical(self, "Błąd", str(e))
@@ -277,9 +382,10 @@ class GPWSimulatorApp(QWidget):
     def sell(self):
         try:
             shares = int(self.shares_input.text())
-            self.portfolio.sell(self.current_stock.name, shares)
-            self.refresh()
-            self.redraw_charts()
+            with self.worker.lock:
+                self.portfolio.sell(self.current_stock.name, shares, date=self.simulator.current_date)
+                snapshot = self.worker.snapshot()
+            self.render(snapshot)
         except Exception as e:
             QMessageBox.critical(self, "Błąd", str(e))
 
@@ -288,14 +394,20 @@ class GPWSimulatorApp(QWidget):
     def set_orders(self):
         try:
             name = self.current_stock.name
-            if name not in self.portfolio.positions:
-                QMessageBox.warning(self, "Błąd", "Nie masz tej spółki w portfelu.")
-                return
-
             sl = float(self.sl_input.text()) if self.sl_input.text() else None
             tp = float(self.tp_input.text()) if self.tp_input.text() else None
 
-            self.portfolio.set_sl_tp(name, sl, tp)
+            with self.worker.lock:
+                held = name in self.portfolio.positions
+                if held:
+                    self.portfolio.set_sl_tp(name, sl, tp)
+                    snapshot = self.worker.snapshot()
+
+            if not held:
+                QMessageBox.warning(self, "Błąd", "Nie masz tej spółki w portfelu.")
+                return
+
+            self.render(snapshot)
             QMessageBox.information(self, "OK", "Ustawiono SL / TP")
 
         except Exception as e:
@@ -303,83 +415,117 @@ class GPWSimulatorApp(QWidget):
 
     # ==========================================================
 
-    def auto_next_day(self):
-        if self.simulator.current_date is None:
+    def jump_to_date(self):
+        if self.current_date is None:
+            QMessageBox.warning(self, "Błąd", "Symulacja jeszcze nie wystartowała.")
             return
 
-        self.simulator.next_day()
-        cd = self.simulator.current_date
-        self.date_picker.setDate(QDate(cd.year, cd.month, cd.day))
+        qd = self.jump_picker.date()
+        self.run_until_requested.emit(datetime(qd.year(), qd.month(), qd.day()))
+
+    def skip_sessions(self):
+        try:
+            sessions = int(self.skip_input.text())
+        except ValueError as e:
+            QMessageBox.critical(self, "Błąd", str(e))
+            return
 
-        self.update_company_box_for_current_date()
-        self.refresh()
-        self.redraw_charts()
+        self.skip_requested.emit(sessions)
 
     # ==========================================================
 
-    def set_speed(self, speed_key):
-        self.timer.setInterval(self.simulation_speeds[speed_key])
+    def on_snapshot(self, snapshot):
+        # Zostawiamy tylko najnowszą migawkę – starsze, nienarysowane, przepadają
+        self.pending_snapshot = snapshot
 
-    # ==========================================================
+    def render_pending(self):
+        snapshot = self.pending_snapshot
+        if snapshot is None:
+            return
+        self.pending_snapshot = None
+        self.render(snapshot)
 
-    def refresh(self):
-        scroll_bar = self.portfolio_view.verticalScrollBar()
-        scroll_pos = scroll_bar.value()
-        text = ""
+    def render(self, snapshot):
+        if self.snapshot is not None and snapshot.serial <= self.snapshot.serial:
+            return
+        self.snapshot = snapshot
+        self.current_date = snapshot.date
 
-        total_invested = 0
-        total_current_value = 0
+        if snapshot.date is None:
+            return
 
-        for name, pos in self.portfolio.positions.items():
-            price = pos.stock.get_price_on_date(self.simulator.current_date)
+        cd = snapshot.date
+        self.update_date_range()
+        self.jump_picker.setMinimumDate(QDate(cd.year, cd.month, cd.day))
 
-            invested = pos.avg_price * pos.shares
-            current_value = price * pos.shares
+        self.update_company_box_for_current_date(snapshot.date)
+        self.refresh(snapshot.valuation, snapshot.date, snapshot.analytics)
+        self.redraw_charts(snapshot)
 
-            total_invested += invested
-            total_current_value += current_value
+    # ==========================================================
 
-            roi = ((current_value - invested) / invested) * 100 if invested > 0 else 0
+    def set_speed(self, speed_key):
+        self.speed = self.simulation_speeds[speed_key]
+        self.simulation_interval.emit(self.speed)
+
+    def set_profiling(self, enabled):
+        if enabled:
+            profiler.reset()
+            profiler.enable()
+            self.profile_timer.start()
+        else:
+            self.profile_timer.stop()
+            profiler.disable()
+        self.profile_view.setVisible(enabled)
+        self.trace_btn.setVisible(enabled)
 
-            color = "#00ff00" if roi > 0 else "#ff4040" if roi < 0 else "#cccccc"
-            roi_text = f'<span style="color:{color};">{roi:.2f} %</span>'
+    def show_profile(self):
+        # Rozkład czasu z ostatniej sekundy, uśredniony na takt symulacji
+        self.profile_view.setText(profiler.format_breakdown(profiler.breakdown()))
 
-            sl_text = f"{pos.stop_loss:.2f}" if pos.stop_loss is not None else "brak"
-            tp_text = f"{pos.take_profit:.2f}" if pos.take_profit is not None else "brak"
+    def export_trace(self):
+        path, _ = QFileDialog.getSaveFileName(self, "Zapisz ślad", "trace.json", "JSON (*.json)")
+        if path:
+            profiler.export_chrome_trace(path)
 
-            text += (
-                f"<b>{name}</b><br>"
-                f"Akcje: {pos.shares}<br>"
-                f"Śr. cena zakupu: {pos.avg_price:.2f}<br>"
-                f"Obecna cena: {price:.2f}<br>"
-                f"Wartość: {current_value:.2f}<br>"
-                f"Zainwestowano: {invested:.2f}<br>"
-                f"Stop Loss: <b>{sl_text}</b><br>"
-                f"Take Profit: <b>{tp_text}</b><br>"
-                f"Stopa zwrotu: {roi_text}<br><br>"
-            )
+    # ==========================================================
 
-        # ===== PODSUMOWANIE PORTFELA =====
-        if total_invested > 0:
-            portfolio_roi = ((total_current_value - total_invested) / total_invested) * 100
-        else:
-            portfolio_roi = 0.0
+    def closeEvent(self, event):
+        self.frame_timer.stop()
+        for thread in (self.loader_thread, self.worker_thread):
+            if thread is not None:
+                thread.quit()
+                thread.wait()
+        super().closeEvent(event)
 
-        if portfolio_roi > 0:
-            portfolio_roi_text = f'<span style="color:#00ff00;">{portfolio_roi:.2f} %</span>'
-        elif portfolio_roi < 0:
-            portfolio_roi_text = f'<span style="color:#ff4040;">{portfolio_roi:.2f} %</span>'
-        else:
-            portfolio_roi_text = f'<span style="color:#cccccc;">{portfolio_roi:.2f} %</span>'
+    # ==========================================================
 
-        if self.simulator.current_date:
-            text += (
-                "<hr>"
-                f"Data symulacji: {self.simulator.current_date.date()}<br>"
+    def refresh(self, snapshot, date, analytics):
+        # Tabela dostaje tylko zmienione wiersze; podsumowanie to jedna etykieta
+        self.portfolio_model.update(snapshot)
+
+        total_invested = snapshot.total_invested
+        total_current_value = snapshot.total_value
+
+        # ===== PODSUMOWANIE PORTFELA =====
+        portfolio_roi = roi(total_current_value, total_invested)
+        color = roi_color(portfolio_roi).name()
+        portfolio_roi_text = f'<span style="color:{color};">{portfolio_roi:.2f} %</span>'
+
+        text = ""
+        if date:
+            text = (
+                f"Data symulacji: {date.date()}<br>"
                 f"<b>Wartość portfela: {total_current_value:.2f} zł</b><br>"
                 f"<b>Zainwestowano łącznie: {total_invested:.2f} zł</b><br>"
-                f"<b>Stopa zwrotu portfela: {portfolio_roi_text}</b>"
+                f"<b>Stopa zwrotu portfela: {portfolio_roi_text}</b><br>"
+                f"Zysk / strata: {analytics.pnl:.2f} zł, "
+                f"stopa ważona czasem: {analytics.total_return * 100:.2f} %<br>"
+                f"Zmienność (roczna): {analytics.volatility * 100:.2f} %, "
+                f"Sharpe: {analytics.sharpe:.2f}, Sortino: {analytics.sortino:.2f}<br>"
+                f"Obsunięcie: {analytics.drawdown * 100:.2f} % "
+                f"(maks. {analytics.max_drawdown * 100:.2f} %)"
             )
 
-        self.portfolio_view.setHtml(text)
-        scroll_bar.setValue(scroll_pos)
\ No newline at end of file
+        if text != self.portfolio_summary.text():
+            self.portfolio_summary.setText(text)
@@ -0,0 +1,102 @@
+from PyQt6.QtCore import QAbstractTableModel, QModelIndex, Qt
+from PyQt6.QtGui import QColor
+
+
+COLUMNS = (
+    "Spółka", "Akcje", "Śr. cena zakupu", "Obecna cena", "Wartość",
+    "Zainwestowano", "Stop Loss", "Take Profit", "Stopa zwrotu",
+)
+ROI_COLUMN = len(COLUMNS) - 1
+
+GREEN = QColor("#00ff00")
+RED = QColor("#ff4040")
+GREY = QColor("#cccccc")
+
+
+def roi(value, invested):
+    return ((value - invested) / invested) * 100 if invested > 0 else 0.0
+
+
+def roi_color(value):
+    return GREEN if value > 0 else RED if value < 0 else GREY
+
+
+class PortfolioTableModel(QAbstractTableModel):
+    # Wiersze to PositionSnapshot z ostatniej migawki wyceny. update() porównuje
+    # je z nową migawką i zgłasza widokowi tylko wiersze, które się zmieniły.
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.rows = []
+        self.row_index = {}
+        self.snapshot = None
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(COLUMNS)
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role == Qt.ItemDataRole.DisplayRole and orientation == Qt.Orientation.Horizontal:
+            return COLUMNS[section]
+        return None
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+
+        pos = self.rows[index.row()]
+        column = index.column()
+
+        if role == Qt.ItemDataRole.DisplayRole:
+            return self._text(pos, column)
+        if role == Qt.ItemDataRole.ForegroundRole and column == ROI_COLUMN:
+            return roi_color(roi(pos.value, pos.invested))
+        if role == Qt.ItemDataRole.TextAlignmentRole and column > 0:
+            return Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter
+        return None
+
+    def _text(self, pos, column):
+        if column == 0:
+            return pos.name
+        if column == 1:
+            return str(pos.shares)
+        if column == 6:
+            return f"{pos.stop_loss:.2f}" if pos.stop_loss is not None else "brak"
+        if column == 7:
+            return f"{pos.take_profit:.2f}" if pos.take_profit is not None else "brak"
+        if column == ROI_COLUMN:
+            return f"{roi(pos.value, pos.invested):.2f} %"
+        return f"{(pos.avg_price, pos.price, pos.value, pos.invested)[column - 2]:.2f}"
+
+    # ==========================================================
+
+    def update(self, snapshot):
+        # Ta sama migawka (dzień bez sesji dla posiadanych spółek) – nic do zrobienia
+        if snapshot is self.snapshot:
+            return
+        self.snapshot = snapshot
+
+        current = {pos.name for pos in snapshot.positions}
+
+        for i in reversed(range(len(self.rows))):
+            if self.rows[i].name not in current:
+                self.beginRemoveRows(QModelIndex(), i, i)
+                del self.rows[i]
+                self.endRemoveRows()
+        self.row_index = {pos.name: i for i, pos in enumerate(self.rows)}
+
+        last = len(COLUMNS) - 1
+        for pos in snapshot.positions:
+            i = self.row_index.get(pos.name)
+
+            if i is None:
+                i = len(self.rows)
+                self.beginInsertRows(QModelIndex(), i, i)
+                self.rows.append(pos)
+                self.row_index[pos.name] = i
+                self.endInsertRows()
+            elif self.rows[i] != pos:
+                self.rows[i] = pos
+                self.dataChanged.emit(self.index(i, 0), self.index(i, last))
@@ -0,0 +1,26 @@
+from PyQt6.QtCore import QSortFilterProxyModel, QStringListModel
+
+
+class ListedTickersModel(QSortFilterProxyModel):
+    # Lista spółek rynku (posortowana raz) przefiltrowana do spółek w obrocie danego dnia.
+    # Filtr jest przeliczany tylko wtedy, gdy między dniami wypadł debiut lub wycofanie.
+
+    def __init__(self, market, parent=None):
+        super().__init__(parent)
+        self.market = market
+        self.listed = None          # None – symulacja nie ruszyła, pokazujemy wszystkie
+        self.epoch = None
+        self.setSourceModel(QStringListModel(market.tickers, self))
+
+    def filterAcceptsRow(self, source_row, source_parent):
+        return self.listed is None or bool(self.listed[source_row])
+
+    def set_date_index(self, date_index):
+        epoch = self.market.listing_epoch(date_index)
+        if epoch == self.epoch:
+            return False
+
+        self.epoch = epoch
+        self.listed = self.market.listed(date_index)
+        self.invalidateRowsFilter()
+        return True
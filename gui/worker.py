@@ -0,0 +1,141 @@
+import threading
+import time
+from typing import NamedTuple
+
+from PyQt6.QtCore import QObject, QTimer, pyqtSignal, pyqtSlot
+
+from PJF.models.market import load_calendar, load_stocks
+
+
+class DaySnapshot(NamedTuple):
+    # Niezmienny stan symulacji po danym dniu – jedyne, co czyta wątek GUI
+    date: object
+    valuation: object           # ValuationSnapshot
+    analytics: object           # AnalyticsSnapshot
+    charts: tuple               # ((stock, first_buy_date), ...) dla otwartych pozycji
+    history_days: object        # widoki na historię do tego dnia (tylko dopisywana)
+    history_values: object
+    fills: tuple
+    finished: bool
+    serial: int                 # rośnie z każdą migawką – GUI pomija spóźnione
+
+
+class SimulationWorker(QObject):
+    snapshot_ready = pyqtSignal(object)
+
+    # "Max": ile najwyżej trwa jedna porcja dni przed publikacją migawki
+    BATCH_SECONDS = 0.01
+
+    def __init__(self, simulator):
+        super().__init__()
+        self.simulator = simulator
+        self.portfolio = simulator.portfolio
+
+        # Wspólna blokada dla kroków symulacji i poleceń z GUI (kupno, sprzedaż, zlecenia)
+        self.lock = threading.Lock()
+        self.timer = None
+        self.interval = 10_000
+        self.serial = 0
+
+    def snapshot(self) -> DaySnapshot:
+        # Wywoływane z założoną blokadą
+        simulator = self.simulator
+        date = simulator.current_date
+        days, values = self.portfolio.history.range()
+        self.serial += 1
+
+        return DaySnapshot(
+            date,
+            self.portfolio.valuation.snapshot(),
+            self.portfolio.analytics.snapshot(),
+            tuple((pos.stock, pos.first_buy_date) for pos in self.portfolio.positions.values()),
+            days,
+            values,
+            tuple(simulator.last_fills),
+            simulator.finished,
+            self.serial,
+        )
+
+    # ==========================================================
+    # Sloty wywoływane sygnałami z GUI – wykonują się w wątku symulacji
+
+    @pyqtSlot(int)
+    def start(self, interval):
+        if self.timer is None:
+            self.timer = QTimer()
+            self.timer.timeout.connect(self.step)
+        self.set_interval(interval)
+        self.timer.start()
+
+    @pyqtSlot()
+    def stop(self):
+        if self.timer is not None:
+            self.timer.stop()
+
+    @pyqtSlot(int)
+    def set_interval(self, interval):
+        self.interval = interval
+        if self.timer is not None:
+            self.timer.setInterval(interval)
+
+    @pyqtSlot()
+    def wake(self):
+        # Timer stoi po końcu danych; wznawiamy go, gdy symulacja znów może iść dalej
+        # (np. po kupnie spółki z dłuższą historią)
+        with self.lock:
+            runnable = not self.simulator.finished
+        if self.timer is not None and runnable and not self.timer.isActive():
+            self.timer.start()
+
+    @pyqtSlot(object)
+    def run_until(self, date):
+        with self.lock:
+            self.simulator.run_until(date)
+            snapshot = self.snapshot()
+        self.snapshot_ready.emit(snapshot)
+
+    @pyqtSlot(int)
+    def skip(self, sessions):
+        with self.lock:
+            self.simulator.skip(sessions)
+            snapshot = self.snapshot()
+        self.snapshot_ready.emit(snapshot)
+
+    @pyqtSlot()
+    def step(self):
+        with self.lock:
+            if self.simulator.finished:
+                # Bez tego timer z interwałem 0 ("Max") kręci się bez końca
+                self.timer.stop()
+                return
+
+            fills = []
+            if self.interval == 0:
+                deadline = time.perf_counter() + self.BATCH_SECONDS
+                while not self.simulator.finished and time.perf_counter() < deadline:
+                    self.simulator.next_day()
+                    fills += self.simulator.last_fills
+                self.simulator.last_fills = fills
+            else:
+                self.simulator.next_day()
+
+            snapshot = self.snapshot()
+
+        self.snapshot_ready.emit(snapshot)
+
+
+class StockLoader(QObject):
+    # Wczytywanie katalogu data/ w tle – okno pokazuje się od razu
+    stock_loaded = pyqtSignal(object, int, int)     # spółka, gotowe, wszystkie
+    loaded = pyqtSignal(object, object)             # {nazwa: Stock}, kalendarz
+    failed = pyqtSignal(str)
+
+    @pyqtSlot()
+    def run(self):
+        try:
+            stocks = load_stocks(progress=self.stock_loaded.emit)
+            calendar = load_calendar()
+        except Exception as e:
+            self.failed.emit(str(e))
+            return
+        self.loaded.emit(stocks, calendar)
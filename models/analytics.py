@@ -0,0 +1,151 @@
+import math
+from typing import NamedTuple
+
+from PJF.models.history import PortfolioHistory
+from PJF.models.trading_calendar import SESSIONS_PER_YEAR
+
+
+# Stan akumulatorów zapisywany razem z przebiegiem symulacji
+_STATE = (
+    "risk_free", "value", "bought", "sold", "pnl",
+    "n", "mean", "m2", "downside", "growth", "peak", "max_drawdown", "realized",
+)
+
+
+class AnalyticsSnapshot(NamedTuple):
+    sessions: int
+    total_return: float         # stopa zwrotu ważona czasem (bez wpływu wpłat / wypłat)
+    pnl: float                  # zysk / strata w zł od początku
+    volatility: float           # roczna
+    sharpe: float
+    sortino: float
+    drawdown: float             # bieżące obsunięcie od szczytu (ujemne lub 0)
+    max_drawdown: float
+    realized: dict              # {spółka: zrealizowany zysk / strata}
+
+
+class PortfolioAnalytics:
+    # Miary ryzyka i wyników liczone strumieniowo – każdy dzień symulacji to O(1)
+    # (średnia i wariancja dziennych stóp zwrotu metodą Welforda), więc wyniki
+    # dla dowolnie długiej symulacji są dostępne od ręki w każdym takcie.
+    #
+    # Portfel nie ma gotówki: kupno zwiększa, a sprzedaż zmniejsza jego wartość.
+    # Dzienna stopa zwrotu to więc zysk dnia bez przepływów, podzielony przez
+    # kapitał zaangażowany tego dnia (wartość z poprzedniej sesji + zakupy).
+
+    def __init__(self, risk_free: float = 0.0):
+        self.risk_free = risk_free / SESSIONS_PER_YEAR      # roczna stopa -> dzienna
+        self.returns = PortfolioHistory()                   # (dzień, dzienna stopa zwrotu)
+
+        self.value = 0.0        # wartość portfela na koniec ostatniej sesji
+        self.bought = 0.0       # przepływy od ostatniej sesji
+        self.sold = 0.0
+        self.pnl = 0.0
+
+        self.n = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.downside = 0.0     # suma kwadratów ujemnych nadwyżek nad stopą wolną od ryzyka
+
+        self.growth = 1.0       # indeks wartości jednostki (iloczyn 1 + r)
+        self.peak = 1.0
+        self.max_drawdown = 0.0
+
+        self.realized = {}
+
+    # ==========================================================
+
+    def mark(self, value):
+        # Punkt wyjścia bez przepływu – np. po odtworzeniu zapisanego portfela
+        self.value = value
+
+    def buy(self, amount):
+        self.bought += amount
+
+    def sell(self, name, shares, price, avg_price):
+        self.sold += shares * price
+        self.realized[name] = self.realized.get(name, 0.0) + shares * (price - avg_price)
+
+    def close_day(self, day, value):
+        gain = value - self.value - self.bought + self.sold
+        base = self.value + self.bought
+        self.pnl += gain
+        self.value = value
+        self.bought = self.sold = 0.0
+
+        # Pusty portfel nie ma stopy zwrotu
+        if base <= 0:
+            return
+
+        r = gain / base
+        self.returns.append_day(day, r)
+
+        self.n += 1
+        delta = r - self.mean
+        self.mean += delta / self.n
+        self.m2 += delta * (r - self.mean)
+
+        excess = r - self.risk_free
+        if excess < 0:
+            self.downside += excess * excess
+
+        self.growth *= 1 + r
+        self.peak = max(self.peak, self.growth)
+        self.max_drawdown = min(self.max_drawdown, self.growth / self.peak - 1)
+
+    # ==========================================================
+
+    @property
+    def volatility(self):
+        if self.n < 2:
+            return 0.0
+        return math.sqrt(self.m2 / (self.n - 1) * SESSIONS_PER_YEAR)
+
+    @property
+    def sharpe(self):
+        if self.n < 2 or self.m2 == 0:
+            return 0.0
+        std = math.sqrt(self.m2 / (self.n - 1))
+        return (self.mean - self.risk_free) / std * math.sqrt(SESSIONS_PER_YEAR)
+
+    @property
+    def sortino(self):
+        if self.n == 0 or self.downside == 0:
+            return 0.0
+        downside = math.sqrt(self.downside / self.n)
+        return (self.mean - self.risk_free) / downside * math.sqrt(SESSIONS_PER_YEAR)
+
+    @property
+    def drawdown(self):
+        return self.growth / self.peak - 1
+
+    def attribution(self, valuation):
+        # {spółka: (zrealizowany, niezrealizowany)} – niezrealizowany z bieżącej wyceny
+        snapshot = valuation.snapshot()
+        result = {name: (pnl, 0.0) for name, pnl in self.realized.items()}
+        for pos in snapshot.positions:
+            result[pos.name] = (self.realized.get(pos.name, 0.0), pos.value - pos.invested)
+        return result
+
+    def snapshot(self) -> AnalyticsSnapshot:
+        return AnalyticsSnapshot(
+            self.n, self.growth - 1, self.pnl, self.volatility, self.sharpe, self.sortino,
+            self.drawdown, self.max_drawdown, dict(self.realized),
+        )
+
+    # ==========================================================
+
+    def to_arrays(self):
+        return {"returns_days": self.returns.days, "returns_values": self.returns.values}
+
+    def to_meta(self):
+        return {name: getattr(self, name) for name in _STATE}
+
+    @classmethod
+    def from_saved(cls, arrays, meta):
+        analytics = cls()
+        for name in _STATE:
+            setattr(analytics, name, meta[name])
+        analytics.realized = dict(meta["realized"])
+        analytics.returns.extend_days(arrays["returns_days"], arrays["returns_values"])
+        return analytics
@@ -0,0 +1,139 @@
+from typing import NamedTuple
+
+import numpy as np
+
+from PJF.models.execution import STOP_LOSS, TAKE_PROFIT, Fill, order_levels, sl_tp_fills
+from PJF.models.stock import from_day, to_day
+from PJF.models.trading_calendar import TradingCalendar
+
+
+def first_trigger(quotes, stop_loss=None, take_profit=None):
+    # Pierwszy wiersz, w którym SL/TP zamyka pozycję: (wiersz, cena realizacji, powód).
+    # Gdy zlecenie nigdy się nie realizuje: (len(quotes.close), None, None).
+    close, open_, high, low, quoted = quotes
+    sl, tp = order_levels(stop_loss, take_profit)
+    filled, price, is_sl = sl_tp_fills(open_, high, low, sl, tp)
+
+    # SL/TP sprawdzamy tylko w dniach rzeczywistej sesji
+    filled &= quoted
+
+    if not filled.any():
+        return len(close), None, None
+
+    row = int(np.argmax(filled))
+    return row, float(price[row]), STOP_LOSS if is_sl[row] else TAKE_PROFIT
+
+
+class Quotes(NamedTuple):
+    close: np.ndarray
+    open: np.ndarray
+    high: np.ndarray
+    low: np.ndarray
+    quoted: np.ndarray
+
+
+def price_columns(stock, days) -> Quotes:
+    # Notowania z ostatniej sesji i maska sesji dla każdego dnia z days
+    stock_days = stock.days
+
+    idx = np.searchsorted(stock_days, days, side="right") - 1
+    if len(idx) and idx[0] < 0:
+        raise ValueError("Brak notowań przed tą datą.")
+
+    return Quotes(
+        stock.close[idx],
+        stock.column("open")[idx],
+        stock.column("high")[idx],
+        stock.column("low")[idx],
+        stock_days[idx] == days,
+    )
+
+
+def default_calendar(portfolio):
+    # Ten sam kalendarz, po którym szedłby Simulator dla tego portfela
+    if portfolio.market is not None:
+        return portfolio.market.calendar
+    return TradingCalendar.from_stocks(pos.stock for pos in portfolio.positions.values())
+
+
+class BacktestResult:
+    def __init__(self, days, values, fills):
+        self.days = days
+        self.values = values
+        self.fills = fills          # realizacje SL/TP w kolejności pozycji
+
+    @property
+    def exits(self):
+        # {nazwa spółki: data zamknięcia przez SL/TP}
+        return {fill.stock_name: fill.date for fill in self.fills}
+
+    @property
+    def history(self):
+        return [(from_day(d), float(v)) for d, v in zip(self.days.tolist(), self.values)]
+
+    @property
+    def end_date(self):
+        return from_day(self.days[-1]) if len(self.days) else None
+
+
+def run_backtest(portfolio, start, end=None, apply=False, calendar=None) -> BacktestResult:
+    # Odpowiednik Simulator.start(start) + next_day() aż do końca danych,
+    # liczony jednym przebiegiem po tablicach (dni × pozycje).
+
+    # Przebieg po tablicach zna tylko SL/TP pozycji – pozostałe zlecenia z księgi
+    # (limit, stop na kupno / część pozycji) realizuje wyłącznie Simulator
+    if any(order.group is None for order in portfolio.orders.orders()):
+        raise ValueError(
+            "Backtest obsługuje tylko SL/TP pozycji – pozostałe zlecenia wymagają symulatora."
+        )
+
+    names = list(portfolio.positions)
+    positions = [portfolio.positions[name] for name in names]
+
+    if not positions:
+        return BacktestResult(np.empty(0, np.int64), np.empty(0), [])
+
+    last_day = min(pos.stock.last_day for pos in positions)
+    if end is not None:
+        last_day = min(last_day, to_day(end))
+
+    if calendar is None:
+        calendar = default_calendar(portfolio)
+    days = calendar.between(start, from_day(last_day))
+    rows = np.arange(len(days))
+
+    values = np.zeros(len(days))
+    fills = []
+    last_prices = {}
+
+    for name, pos in zip(names, positions):
+        quotes = price_columns(pos.stock, days)
+        exit_row, fill_price, reason = first_trigger(quotes, pos.stop_loss, pos.take_profit)
+        if exit_row < len(days):
+            fills.append(Fill(from_day(days[exit_row]), name, pos.shares, fill_price, reason))
+        elif len(days):
+            last_prices[name] = float(quotes.close[-1])
+
+        # Sumujemy kolumnami w kolejności pozycji – tak samo jak Simulator.update
+        values += np.where(rows < exit_row, pos.shares * quotes.close, 0.0)
+
+    result = BacktestResult(days, values, fills)
+
+    if apply and len(days):
+        portfolio.history.extend_days(result.days, result.values)
+
+        # Dzień po dniu: wyjścia przez SL/TP jako sprzedaże (dziennik, analityka),
+        # potem zamknięcie dnia w analityce
+        exits = {}
+        for fill in fills:
+            exits.setdefault(to_day(fill.date), []).append(fill)
+        for day, value in zip(days.tolist(), values.tolist()):
+            for fill in exits.get(day, ()):
+                portfolio.sell(fill.stock_name, fill.shares, fill.price, fill.date, fill.reason)
+            portfolio.analytics.close_day(day, value)
+
+        for name, price in last_prices.items():
+            portfolio.valuation.update_price(name, price)
+        portfolio.valuation.set_date(result.end_date)
+
+    return result
@@ -0,0 +1,113 @@
+import pandas as pd
+
+from PJF.models.portfolio import Portfolio
+from PJF.models.simulator import Simulator
+from PJF.models.stock import to_day
+
+
+class BatchSimulator:
+    # Wiele portfeli (warianty strategii, konta użytkowników) na jednym, tylko do odczytu
+    # rynku i jednym strumieniu dat. Wiersz rynku każdej sesji (MarketDay) powstaje raz
+    # i trafia do wszystkich portfeli; portfel to tylko jego pozycje, zlecenia i historia.
+
+    def __init__(self, market, portfolios=None):
+        self.market = market
+        self.calendar = market.calendar
+        self.simulators = {}
+
+        self.day_index = None
+        self.max_index = None
+        self.current_date = None
+        self.start_date = None
+        self.day = None             # MarketDay bieżącej sesji
+
+        for name, portfolio in (portfolios or {}).items():
+            self.add(name, portfolio)
+
+    def add(self, name, portfolio=None) -> Portfolio:
+        if name in self.simulators:
+            raise ValueError(f"Portfel {name} już istnieje.")
+        if portfolio is None:
+            portfolio = Portfolio(self.market)
+        elif portfolio.market is not self.market:
+            raise ValueError("Portfele symulacji zbiorczej muszą korzystać z tego samego rynku.")
+
+        simulator = Simulator(portfolio, self.calendar)
+        if self.current_date is not None:
+            simulator.resume(self.current_date, self.current_date, None)
+        self.simulators[name] = simulator
+        return portfolio
+
+    def portfolio(self, name) -> Portfolio:
+        return self.simulators[name].portfolio
+
+    @property
+    def portfolios(self):
+        return {name: sim.portfolio for name, sim in self.simulators.items()}
+
+    # ==========================================================
+
+    def start(self, date, end=None):
+        # Wspólny start; koniec – end albo ostatnia sesja kalendarza
+        self.start_date = date
+        self.current_date = date
+        self.day_index = self.calendar.index_of(date)
+        self.max_index = len(self.calendar) - 1 if end is None else self.calendar.index_of(end)
+        self.day = self.market.day(self.day_index) if self.day_index >= 0 else None
+
+        for simulator in self.simulators.values():
+            simulator.resume(date, date, None)
+
+    @property
+    def finished(self):
+        return self.day_index is None or self.day_index >= self.max_index
+
+    def next_day(self):
+        if self.finished:
+            return
+
+        self.day_index += 1
+        self.current_date = self.calendar.date(self.day_index)
+        day = self.day = self.market.day(self.day_index)
+
+        for simulator in self.simulators.values():
+            simulator.day_index = self.day_index
+            simulator.current_date = self.current_date
+            simulator.update(day)
+
+    def run_until(self, date=None):
+        # Do date włącznie; gdy date nie jest sesją – do ostatniej sesji przed nią
+        steps = 0
+        target = None if date is None else to_day(date)
+        while not self.finished and (
+            target is None or self.calendar.days[self.day_index + 1] <= target
+        ):
+            self.next_day()
+            steps += 1
+        return steps
+
+    def fills(self):
+        # Realizacje zleceń z ostatniej sesji: {portfel: [Fill, ...]}
+        return {
+            name: sim.last_fills for name, sim in self.simulators.items() if sim.last_fills
+        }
+
+    # ==========================================================
+
+    def summary(self) -> pd.DataFrame:
+        rows = []
+        for name, simulator in self.simulators.items():
+            portfolio = simulator.portfolio
+            analytics = portfolio.analytics
+            rows.append({
+                "portfolio": name,
+                "positions": len(portfolio.positions),
+                "value": portfolio.valuation.total_value,
+                "pnl": analytics.pnl,
+                "total_return": analytics.growth - 1,
+                "volatility": analytics.volatility,
+                "sharpe": analytics.sharpe,
+                "sortino": analytics.sortino,
+                "max_drawdown": analytics.max_drawdown,
+            })
+        return pd.DataFrame(rows).set_index("portfolio")
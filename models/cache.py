@@ -0,0 +1,221 @@
+import hashlib
+import json
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+import pandas as pd
+
+
+CACHE_VERSION = 2
+
+# Wiersze tablicy (6, n) zapisywanej dla każdej spółki
+COLUMNS = ("day", "open", "high", "low", "close", "volume")
+ROW = {name: i for i, name in enumerate(COLUMNS)}
+
+
+def read_csv_columns(csv_path: str) -> np.ndarray:
+    data = pd.read_csv(csv_path, sep=";")
+    data.columns = data.columns.str.strip().str.lower()
+
+    data.rename(columns={
+        "data": "date",
+        "otwarcie": "open",
+        "najwyzszy": "high",
+        "najnizszy": "low",
+        "zamkniecie": "close",
+        "wolumen": "volume"
+    }, inplace=True)
+
+    data["date"] = pd.to_datetime(data["date"])
+    data.sort_values("date", inplace=True)
+
+    columns = np.empty((len(COLUMNS), len(data)), dtype=np.float64)
+    columns[0] = data["date"].values.astype("datetime64[D]").astype(np.int64)
+    for name in COLUMNS[1:]:
+        columns[ROW[name]] = data[name].to_numpy(dtype=np.float64)
+
+    return columns
+
+
+def _file_hash(path: str) -> str:
+    with open(path, "rb") as f:
+        return hashlib.blake2b(f.read(), digest_size=16).hexdigest()
+
+
+def _write_npy(path: str, columns: np.ndarray):
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        np.save(f, columns)
+    os.replace(tmp, path)
+
+
+def _entry(csv_path: str, columns: np.ndarray) -> dict:
+    st = os.stat(csv_path)
+    return {
+        "mtime_ns": st.st_mtime_ns,
+        "size": st.st_size,
+        "hash": _file_hash(csv_path),
+        "rows": int(columns.shape[1]),
+        "first_day": int(columns[0, 0]) if columns.shape[1] else None,
+        "last_day": int(columns[0, -1]) if columns.shape[1] else None,
+    }
+
+
+def _build(csv_path: str, npy_path: str) -> dict:
+    # W procesie roboczym: parsowanie CSV, konwersja dat i zapis .npy;
+    # do procesu głównego wraca tylko wpis manifestu
+    columns = read_csv_columns(csv_path)
+    _write_npy(npy_path, columns)
+    return _entry(csv_path, columns)
+
+
+class DataCache:
+    MANIFEST = "manifest.json"
+
+    def __init__(self, data_dir: str, cache_dir: str | None = None):
+        self.data_dir = data_dir
+        self.cache_dir = cache_dir or os.path.join(data_dir, ".cache")
+        self._dirty = False
+        self._calendar_signature = None
+        self._manifest = self._read_manifest()
+        self._checked = set()
+
+    def _read_manifest(self):
+        path = os.path.join(self.cache_dir, self.MANIFEST)
+        try:
+            with open(path, encoding="utf-8") as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+        # Inna wersja formatu – cały cache do przebudowy
+        if manifest.get("version") != CACHE_VERSION:
+            return {}
+        self._calendar_signature = manifest.get("calendar")
+        return manifest.get("files", {})
+
+    def _npy_path(self, key):
+        return os.path.join(self.cache_dir, key[:-len(".csv")] + ".npy")
+
+    def is_fresh(self, csv_path: str) -> bool:
+        key = os.path.basename(csv_path)
+        if key in self._checked:
+            return True
+
+        entry = self._manifest.get(key)
+        if entry is None or not os.path.exists(self._npy_path(key)):
+            return False
+
+        st = os.stat(csv_path)
+        if entry["size"] != st.st_size:
+            return False
+        if entry["mtime_ns"] != st.st_mtime_ns:
+            # Zmieniony tylko czas modyfikacji (np. po git checkout) – sprawdzamy treść
+            if entry["hash"] != _file_hash(csv_path):
+                return False
+            entry["mtime_ns"] = st.st_mtime_ns
+            self._dirty = True
+
+        self._checked.add(key)
+        return True
+
+    def store(self, csv_path: str, columns: np.ndarray):
+        key = os.path.basename(csv_path)
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+        _write_npy(self._npy_path(key), columns)
+        self._set_entry(key, _entry(csv_path, columns))
+
+    def _set_entry(self, key, entry):
+        self._manifest[key] = entry
+        self._checked.add(key)
+        self._dirty = True
+
+    def build(self, csv_paths, processes: int | None = None):
+        # Generator: zwraca ścieżki w kolejności, w jakiej ich cache staje się aktualny.
+        # Nieaktualne pliki są parsowane równolegle w puli procesów.
+        stale = []
+        for path in csv_paths:
+            if self.is_fresh(path):
+                yield path
+            else:
+                stale.append(path)
+
+        if not stale:
+            return
+
+        processes = min(processes or os.cpu_count() or 1, len(stale))
+        if processes == 1:
+            for path in stale:
+                self.store(path, read_csv_columns(path))
+                yield path
+            return
+
+        os.makedirs(self.cache_dir, exist_ok=True)
+        # "spawn" – bezpieczne także wtedy, gdy proces ma już inne wątki (GUI)
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(processes, mp_context=context) as pool:
+            futures = {
+                pool.submit(_build, path, self._npy_path(os.path.basename(path))): path
+                for path in stale
+            }
+            for future in as_completed(futures):
+                path = futures[future]
+                self._set_entry(os.path.basename(path), future.result())
+                yield path
+
+    def metadata(self, csv_path: str) -> dict:
+        if not self.is_fresh(csv_path):
+            self.store(csv_path, read_csv_columns(csv_path))
+        return self._manifest[os.path.basename(csv_path)]
+
+    def load(self, csv_path: str) -> np.ndarray:
+        if not self.is_fresh(csv_path):
+            self.store(csv_path, read_csv_columns(csv_path))
+
+        # Mapowanie pamięci – czytane są tylko faktycznie używane strony
+        return np.load(self._npy_path(os.path.basename(csv_path)), mmap_mode="r")
+
+    def calendar(self, csv_paths) -> np.ndarray:
+        # Suma dni sesyjnych wszystkich plików, zapisana obok danych i
+        # przeliczana tylko wtedy, gdy zmienił się któryś z plików
+        keys = sorted(os.path.basename(path) for path in csv_paths)
+        for path in csv_paths:
+            if not self.is_fresh(path):
+                self.store(path, read_csv_columns(path))
+
+        signature = hashlib.blake2b(
+            json.dumps([(key, self._manifest[key]["hash"]) for key in keys]).encode(),
+            digest_size=16
+        ).hexdigest()
+
+        path = os.path.join(self.cache_dir, "calendar.npy")
+        if self._calendar_signature == signature and os.path.exists(path):
+            return np.load(path)
+
+        days = [self.load(p)[ROW["day"]].astype(np.int64) for p in csv_paths]
+        calendar = np.unique(np.concatenate(days)) if days else np.empty(0, np.int64)
+
+        _write_npy(path, calendar)
+
+        self._calendar_signature = signature
+        self._dirty = True
+        return calendar
+
+    def save(self):
+        if not self._dirty:
+            return
+
+        os.makedirs(self.cache_dir, exist_ok=True)
+        path = os.path.join(self.cache_dir, self.MANIFEST)
+        tmp = path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({
+                "version": CACHE_VERSION,
+                "files": self._manifest,
+                "calendar": self._calendar_signature,
+            }, f)
+        os.replace(tmp, path)
+        self._dirty = False
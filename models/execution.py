@@ -0,0 +1,44 @@
+from typing import NamedTuple
+
+import numpy as np
+
+
+STOP_LOSS = "SL"
+TAKE_PROFIT = "TP"
+
+
+class Fill(NamedTuple):
+    date: object
+    stock_name: str
+    shares: int
+    price: float
+    reason: str
+
+
+def sl_tp_fills(open_, high, low, stop_loss, take_profit):
+    # Wszystkie argumenty to tablice po pozycjach; NaN w stop_loss / take_profit = brak zlecenia.
+    # Zwraca (czy zrealizowano, cena realizacji, czy był to stop loss).
+    with np.errstate(invalid="ignore"):
+        sl_hit = low <= stop_loss
+        tp_hit = high >= take_profit
+        sl_gap = open_ <= stop_loss
+        tp_gap = open_ >= take_profit
+
+    # Luka na otwarciu realizuje zlecenie po kursie otwarcia. Gdy w ciągu sesji
+    # dotknięte są oba poziomy, nie wiadomo który pierwszy – zakładamy stop loss.
+    is_sl = sl_hit & ~tp_gap
+    is_tp = tp_hit & ~is_sl
+
+    price = np.where(
+        is_sl,
+        np.where(sl_gap, open_, stop_loss),
+        np.where(tp_gap, open_, take_profit)
+    )
+    return is_sl | is_tp, price, is_sl
+
+
+def order_levels(stop_loss, take_profit):
+    return (
+        np.nan if stop_loss is None else stop_loss,
+        np.nan if take_profit is None else take_profit,
+    )
@@ -0,0 +1,119 @@
+import os
+import tempfile
+
+import numpy as np
+
+from PJF.models.stock import from_day, to_day
+
+
+class PortfolioHistory:
+    # Historia wartości portfela: dzień (int64, dni od 1970-01-01) + wartość (float64).
+    # Tablice rosną przez podwajanie; po przekroczeniu spill_rows trafiają do plików
+    # mapowanych w pamięci w katalogu spill_dir.
+
+    def __init__(self, capacity: int = 256, spill_dir: str | None = None,
+                 spill_rows: int = 1_000_000):
+        self.spill_dir = spill_dir
+        self.spill_rows = spill_rows
+        self._size = 0
+        self._files = []
+        self._days = np.empty(capacity, dtype=np.int64)
+        self._values = np.empty(capacity, dtype=np.float64)
+
+    # ==========================================================
+
+    def _allocate(self, capacity, dtype):
+        if self.spill_dir is None or capacity < self.spill_rows:
+            return np.empty(capacity, dtype=dtype)
+
+        os.makedirs(self.spill_dir, exist_ok=True)
+        fd, path = tempfile.mkstemp(suffix=".npy", dir=self.spill_dir)
+        os.close(fd)
+        self._files.append(path)
+        return np.lib.format.open_memmap(path, mode="w+", dtype=dtype, shape=(capacity,))
+
+    def _grow(self, needed):
+        capacity = len(self._days)
+        if needed <= capacity:
+            return
+
+        capacity = max(capacity, 1)
+        while capacity < needed:
+            capacity *= 2
+
+        old_files = self._files
+        self._files = []
+
+        days = self._allocate(capacity, np.int64)
+        values = self._allocate(capacity, np.float64)
+        days[:self._size] = self._days[:self._size]
+        values[:self._size] = self._values[:self._size]
+        self._days, self._values = days, values
+
+        for path in old_files:
+            os.remove(path)
+
+    def close(self):
+        # Usuwa pliki tymczasowe po zakończeniu długiej symulacji
+        self._days = np.array(self._days[:self._size])
+        self._values = np.array(self._values[:self._size])
+        for path in self._files:
+            os.remove(path)
+        self._files = []
+
+    # ==========================================================
+
+    def append(self, item):
+        date, value = item
+        self.append_day(to_day(date), value)
+
+    def append_day(self, day: int, value: float):
+        if self._size == len(self._days):
+            self._grow(self._size + 1)
+        self._days[self._size] = day
+        self._values[self._size] = value
+        self._size += 1
+
+    def extend(self, items):
+        for item in items:
+            self.append(item)
+
+    def extend_days(self, days, values):
+        n = len(days)
+        self._grow(self._size + n)
+        self._days[self._size:self._size + n] = days
+        self._values[self._size:self._size + n] = values
+        self._size += n
+
+    # ==========================================================
+
+    @property
+    def days(self) -> np.ndarray:
+        return self._days[:self._size]
+
+    @property
+    def values(self) -> np.ndarray:
+        return self._values[:self._size]
+
+    def range(self, start=None, end=None):
+        # Widoki (bez kopiowania) na wpisy z przedziału [start, end]
+        days = self.days
+        lo = 0 if start is None else int(np.searchsorted(days, to_day(start), side="left"))
+        hi = self._size if end is None else int(np.searchsorted(days, to_day(end), side="right"))
+        return days[lo:hi], self.values[lo:hi]
+
+    def __len__(self):
+        return self._size
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[k] for k in range(*i.indices(self._size))]
+        if i < 0:
+            i += self._size
+        if not 0 <= i < self._size:
+            raise IndexError("Indeks historii poza zakresem.")
+        return from_day(self._days[i]), float(self._values[i])
+
+    def __iter__(self):
+        for day, value in zip(self.days.tolist(), self.values.tolist()):
+            yield from_day(day), value
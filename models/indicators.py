@@ -0,0 +1,161 @@
+import numpy as np
+import pandas as pd
+
+from PJF.models.trading_calendar import SESSIONS_PER_YEAR
+
+
+class _Window:
+    # Suma, suma kwadratów i liczba wartości (bez NaN) z ostatnich `width` wierszy,
+    # dla wszystkich spółek naraz – dodanie / usunięcie wiersza to O(spółek)
+
+    def __init__(self, width, n):
+        self.width = width
+        self.sum = np.zeros(n)
+        self.sumsq = np.zeros(n)
+        self.count = np.zeros(n, dtype=np.int64)
+
+    def clear(self):
+        self.sum[:] = 0.0
+        self.sumsq[:] = 0.0
+        self.count[:] = 0
+
+    def _apply(self, values, sign):
+        valid = ~np.isnan(values)
+        values = np.where(valid, values, 0.0)
+        self.sum += sign * values
+        self.sumsq += sign * values * values
+        self.count += sign * valid
+
+    def add(self, values):
+        self._apply(values, 1)
+
+    def remove(self, values):
+        self._apply(values, -1)
+
+    def mean(self, min_count=None):
+        # Domyślnie tylko pełne okno; NaN, gdy danych jest mniej
+        min_count = self.width if min_count is None else min_count
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return np.where(self.count >= min_count, self.sum / self.count, np.nan)
+
+    def std(self):
+        # Odchylenie standardowe z próby (ddof=1), tylko dla pełnego okna
+        n = self.count
+        with np.errstate(invalid="ignore", divide="ignore"):
+            var = (self.sumsq - self.sum * self.sum / n) / (n - 1)
+            return np.where(n >= max(self.width, 2), np.sqrt(np.maximum(var, 0.0)), np.nan)
+
+
+class Indicators:
+    # Wskaźniki dla całego rynku liczone przyrostowo po wierszach kalendarza:
+    # przejście o jedną sesję to kilka operacji na wektorach długości liczby spółek.
+    # Stan w wierszu i zależy wyłącznie od wierszy <= i (bez zaglądania w przyszłość).
+
+    def __init__(self, market, short=20, long=50, momentum=20, volatility=20, volume=20):
+        self.market = market
+        self.close = market.close                           # ceny przeniesione na dni bez sesji
+        self.volume = market.session_matrix("volume")       # NaN w dni bez sesji
+        self.momentum = momentum
+
+        n = len(market.tickers)
+        self.sma_short = _Window(short, n)
+        self.sma_long = _Window(long, n)
+        self.returns = _Window(volatility, n)
+        self.volumes = _Window(volume, n)                   # do volume_ratio kolejnej sesji
+        self._windows = (
+            (self.sma_short, self._close_row),
+            (self.sma_long, self._close_row),
+            (self.returns, self._return_row),
+            (self.volumes, self._volume_row),
+        )
+        self._widest = max(short, long, momentum, volatility, volume) + 1
+
+        self.row = -1
+        self._start = 0
+        self.volume_ratio = np.full(n, np.nan)
+        self.last_quote = np.full(n, -1, dtype=np.int64)    # wiersz ostatniej sesji spółki
+
+    # ==========================================================
+
+    def _close_row(self, i):
+        return self.close[i]
+
+    def _return_row(self, i):
+        if i == 0:
+            return np.full(self.close.shape[1], np.nan)
+        return self.close[i] / self.close[i - 1] - 1
+
+    def _volume_row(self, i):
+        return self.volume[i]
+
+    def _step(self, i):
+        # Wolumen dnia względem średniej z poprzednich sesji (dni bez sesji pomijane)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            self.volume_ratio = self.volume[i] / self.volumes.mean(min_count=1)
+
+        for window, values in self._windows:
+            window.add(values(i))
+            if i - window.width >= self._start:
+                window.remove(values(i - window.width))
+
+        self.last_quote[self.market.quoted[i]] = i
+        self.row = i
+
+    def _rebuild(self, i):
+        # Od zera, z najszerszego okna przed wierszem i
+        self._start = max(i - self._widest + 1, 0)
+        for window, _ in self._windows:
+            window.clear()
+        self.last_quote[:] = -1
+
+        quoted = self.market.quoted[:self._start]
+        seen = quoted.any(axis=0)
+        self.last_quote[seen] = len(quoted) - 1 - np.argmax(quoted[::-1, seen], axis=0)
+
+        for j in range(self._start, i + 1):
+            self._step(j)
+
+    def seek(self, date_index):
+        # Do przodu o mniej niż okno – krok po kroku; inaczej (skok, cofnięcie) – od nowa
+        if date_index < self.row or date_index - self.row > self._widest:
+            self._rebuild(date_index)
+        else:
+            for i in range(self.row + 1, date_index + 1):
+                self._step(i)
+
+    # ==========================================================
+
+    def values(self) -> dict:
+        i = self.row
+        close = self.close[i]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            momentum = close / self.close[i - self.momentum] - 1 if i >= self.momentum else np.nan
+
+        return {
+            "close": close,
+            "sma_short": self.sma_short.mean(),
+            "sma_long": self.sma_long.mean(),
+            "return_1d": self._return_row(i),
+            "momentum": np.broadcast_to(momentum, close.shape),
+            "volatility": self.returns.std() * np.sqrt(SESSIONS_PER_YEAR),
+            "volume": self.volume[i],
+            "volume_ratio": self.volume_ratio,
+            "sessions_since_quote": np.where(self.last_quote >= 0, i - self.last_quote, -1),
+        }
+
+    def screen(self, date, max_stale: int | None = 5) -> pd.DataFrame:
+        # Wskaźniki wszystkich spółek na dzień date (ostatnia sesja <= date).
+        # Pomijane są spółki przed debiutem i te bez notowań od więcej niż max_stale sesji –
+        # bez wiedzy o przyszłych notowaniach.
+        di = self.market.date_index(date)
+        if di < 0:
+            return pd.DataFrame(columns=["close"]).rename_axis("ticker")
+
+        self.seek(di)
+        frame = pd.DataFrame(self.values(), index=pd.Index(self.market.tickers, name="ticker"))
+        frame["quoted"] = self.market.quoted[di]
+
+        keep = self.last_quote >= 0
+        if max_stale is not None:
+            keep &= frame["sessions_since_quote"].to_numpy() <= max_stale
+        return frame[keep]
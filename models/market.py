@@ -0,0 +1,157 @@
+import os
+
+import numpy as np
+
+from PJF.models.cache import DataCache
+from PJF.models.stock import DEFAULT_MEMORY_BUDGET, Stock, StockLRU, to_day
+from PJF.models.trading_calendar import TradingCalendar
+
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data")
+
+
+def load_stocks(data_dir: str = DATA_DIR, use_cache: bool = True,
+                memory_budget: int | None = DEFAULT_MEMORY_BUDGET,
+                processes: int | None = None, progress=None):
+    # progress(stock, gotowe, wszystkie) – wywoływane po każdej wczytanej spółce
+    if not os.path.exists(data_dir):
+        raise FileNotFoundError(f"Nie znaleziono katalogu danych: {data_dir}")
+
+    cache = DataCache(data_dir) if use_cache else None
+    lru = StockLRU(memory_budget) if use_cache and memory_budget is not None else None
+    stocks = {}
+
+    paths = [os.path.join(data_dir, f) for f in os.listdir(data_dir) if f.endswith(".csv")]
+    total = len(paths)
+    if cache is not None:
+        # Pliki bez aktualnego cache parsowane są równolegle; spółki pojawiają się
+        # w kolejności ukończenia
+        paths = cache.build(paths, processes)
+
+    for path in paths:
+        name = os.path.basename(path).replace(".csv", "").replace("_", " ")
+        stocks[name] = Stock(name, path, cache, lru)
+        if progress is not None:
+            progress(stocks[name], len(stocks), total)
+
+    if cache is not None:
+        cache.save()
+
+    return stocks
+
+
+def load_calendar(data_dir: str = DATA_DIR) -> TradingCalendar:
+    cache = DataCache(data_dir)
+    paths = [os.path.join(data_dir, f) for f in os.listdir(data_dir) if f.endswith(".csv")]
+    calendar = TradingCalendar(cache.calendar(paths))
+    cache.save()
+    return calendar
+
+
+class Market:
+    def __init__(self, stocks, calendar: TradingCalendar | None = None):
+        self.stocks = stocks
+        self.tickers = sorted(stocks)
+        self.ticker_index = {name: j for j, name in enumerate(self.tickers)}
+
+        # Kalendarz rynku: suma dni sesyjnych wszystkich spółek
+        if calendar is None:
+            calendar = TradingCalendar.from_stocks(stocks[name] for name in self.tickers)
+        self.calendar = calendar
+
+        days = [stocks[name].days for name in self.tickers]
+        closes = [stocks[name].close for name in self.tickers]
+
+        n_days, n_tickers = len(calendar), len(self.tickers)
+        self.quoted = np.zeros((n_days, n_tickers), dtype=bool)
+        raw = np.full((n_days, n_tickers), np.nan)
+
+        self.first_index = np.empty(n_tickers, dtype=np.int64)
+        self.last_index = np.empty(n_tickers, dtype=np.int64)
+
+        for j, (d, c) in enumerate(zip(days, closes)):
+            rows = np.searchsorted(calendar.days, d)
+            self.quoted[rows, j] = True
+            raw[rows, j] = c
+            self.first_index[j] = rows[0]
+            self.last_index[j] = rows[-1]
+
+        # Indeksy dni, w których zmienia się zbiór spółek w obrocie (debiut / ostatnia sesja)
+        self.listing_events = np.unique(np.concatenate([self.first_index, self.last_index + 1]))
+
+        # Przeniesienie ostatniej ceny na dni bez sesji danej spółki
+        source = np.where(self.quoted, np.arange(n_days)[:, None], 0)
+        np.maximum.accumulate(source, axis=0, out=source)
+        self.close = np.ascontiguousarray(raw[source, np.arange(n_tickers)])
+
+        self._session_matrices = {}
+
+    # ==========================================================
+
+    def date_index(self, date) -> int:
+        # Indeks ostatniego dnia kalendarza <= date (-1 przed początkiem danych)
+        return self.calendar.index_of(date)
+
+    def is_session(self, date_index: int, date) -> bool:
+        return date_index >= 0 and self.calendar.days[date_index] == to_day(date)
+
+    def price(self, date_index: int, ticker_index: int) -> float:
+        price = self.close[date_index, ticker_index] if date_index >= 0 else np.nan
+        if price != price:
+            raise ValueError("Brak notowań przed tą datą.")
+        return float(price)
+
+    def has_quote(self, date_index: int, ticker_index: int) -> bool:
+        return bool(self.quoted[date_index, ticker_index])
+
+    def session_matrix(self, column: str) -> np.ndarray:
+        # Macierz (kalendarz × spółka) kolumny open/high/low/volume, NaN w dni bez sesji.
+        # Budowana przy pierwszym użyciu.
+        matrix = self._session_matrices.get(column)
+        if matrix is None:
+            matrix = np.full(self.quoted.shape, np.nan)
+            for j, name in enumerate(self.tickers):
+                stock = self.stocks[name]
+                matrix[np.searchsorted(self.calendar.days, stock.days), j] = stock.column(column)
+            self._session_matrices[column] = matrix
+        return matrix
+
+    def day(self, date_index: int) -> "MarketDay":
+        return MarketDay(self, date_index)
+
+    def price_on_date(self, name: str, date) -> float:
+        # Zapytania po nazwie i dacie sprowadzone do (indeks dnia, indeks spółki)
+        return self.price(self.date_index(date), self.ticker_index[name])
+
+    def has_quote_on_date(self, name: str, date) -> bool:
+        di = self.date_index(date)
+        return self.is_session(di, date) and self.has_quote(di, self.ticker_index[name])
+
+    def listed(self, date_index: int) -> np.ndarray:
+        # Maska spółek w obrocie: od pierwszego do ostatniego notowania włącznie
+        return (self.first_index <= date_index) & (date_index <= self.last_index)
+
+    def listing_epoch(self, date_index: int) -> int:
+        # Numer okresu między kolejnymi debiutami / wycofaniami – ten sam numer,
+        # ten sam zbiór spółek w obrocie
+        return int(np.searchsorted(self.listing_events, date_index, side="right"))
+
+
+class MarketDay:
+    # Wiersz rynku jednej sesji (widoki, bez kopiowania). Wiersze open/high/low
+    # pobierane są raz i współdzielone przez wszystkie portfele symulowane tego dnia.
+    __slots__ = ("market", "index", "day", "quoted", "close", "_sessions")
+
+    def __init__(self, market, index):
+        self.market = market
+        self.index = index
+        self.day = int(market.calendar.days[index])
+        self.quoted = market.quoted[index]
+        self.close = market.close[index]
+        self._sessions = {}
+
+    def session(self, column: str) -> np.ndarray:
+        row = self._sessions.get(column)
+        if row is None:
+            row = self._sessions[column] = self.market.session_matrix(column)[self.index]
+        return row
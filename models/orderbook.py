@@ -0,0 +1,143 @@
+import heapq
+from bisect import bisect_left, bisect_right, insort
+
+from PJF.models.stock import to_day
+
+
+BUY = "BUY"
+SELL = "SELL"
+
+LIMIT = "LIMIT"
+STOP = "STOP"
+
+
+class Order:
+    __slots__ = ("id", "stock", "side", "kind", "price", "shares", "good_till", "group", "reason")
+
+    def __init__(self, stock, side, kind, price, shares=None, good_till=None,
+                 group=None, reason=None):
+        self.id = None
+        self.stock = stock
+        self.side = side
+        self.kind = kind
+        self.price = price
+        self.shares = shares            # None = cała pozycja (SL / TP)
+        self.good_till = None if good_till is None else to_day(good_till)
+        self.group = group              # zlecenia jednej grupy anulują się nawzajem (OCO)
+        self.reason = reason or kind
+
+    @property
+    def triggers_below(self):
+        # Kupno z limitem i stop na sprzedaż realizują się, gdy minimum sesji spadnie do ceny
+        return (self.side == BUY) == (self.kind == LIMIT)
+
+
+class OrderBook:
+    def __init__(self):
+        # {spółka: posortowana lista (cena, id, zlecenie)}
+        self._below = {}
+        self._above = {}
+        self._stocks = {}           # {spółka: Stock} – dla spółek z aktywnymi zleceniami
+        self._orders = {}
+        self._groups = {}
+        self._expiry = []
+        self._next_id = 0
+
+    def __len__(self):
+        return len(self._orders)
+
+    def __contains__(self, order_id):
+        return order_id in self._orders
+
+    def tickers(self):
+        return set(self._below) | set(self._above)
+
+    def stock(self, ticker):
+        return self._stocks[ticker]
+
+    def orders(self, ticker=None):
+        return [
+            order for order in self._orders.values()
+            if ticker is None or order.stock.name == ticker
+        ]
+
+    # ==========================================================
+
+    def place(self, order: Order) -> int:
+        order.id = self._next_id
+        self._next_id += 1
+        self._orders[order.id] = order
+
+        side = self._below if order.triggers_below else self._above
+        insort(side.setdefault(order.stock.name, []), (order.price, order.id, order))
+        self._stocks[order.stock.name] = order.stock
+
+        if order.group is not None:
+            self._groups.setdefault(order.group, set()).add(order.id)
+        if order.good_till is not None:
+            heapq.heappush(self._expiry, (order.good_till, order.id))
+        return order.id
+
+    def cancel(self, order_id):
+        order = self._orders.pop(order_id, None)
+        if order is None:
+            return None
+
+        side = self._below if order.triggers_below else self._above
+        entries = side[order.stock.name]
+        i = bisect_left(entries, (order.price, order.id))
+        del entries[i]
+        if not entries:
+            del side[order.stock.name]
+            if order.stock.name not in self._below and order.stock.name not in self._above:
+                del self._stocks[order.stock.name]
+
+        if order.group is not None:
+            group = self._groups[order.group]
+            group.discard(order_id)
+            if not group:
+                del self._groups[order.group]
+        return order
+
+    def cancel_group(self, group):
+        for order_id in list(self._groups.get(group, ())):
+            self.cancel(order_id)
+
+    def expire(self, date):
+        # Zlecenia ważne do dnia good_till znikają po jego upływie
+        day = to_day(date)
+        expired = []
+        while self._expiry and self._expiry[0][0] < day:
+            _, order_id = heapq.heappop(self._expiry)
+            order = self.cancel(order_id)
+            if order is not None:
+                expired.append(order)
+        return expired
+
+    # ==========================================================
+
+    def match(self, ticker, open_, high, low):
+        # Zlecenia, których cena wyzwolenia mieści się w zakresie [low, high] sesji.
+        # Przeglądane są tylko te wpisy – dzięki sortowaniu po cenie reszta nie jest ruszana.
+        triggered = []
+
+        below = self._below.get(ticker, ())
+        for price, _, order in below[bisect_left(below, (low,)):]:
+            triggered.append((open_ > price, 0, order, min(open_, price)))
+
+        above = self._above.get(ticker, ())
+        for price, _, order in above[:bisect_right(above, (high, float("inf")))]:
+            triggered.append((open_ < price, 1, order, max(open_, price)))
+
+        # Najpierw luki na otwarciu, potem (ostrożnie) zlecenia od strony minimum sesji
+        triggered.sort(key=lambda item: (item[0], item[1], item[2].id))
+
+        fills = []
+        for _, _, order, price in triggered:
+            if order.id not in self._orders:
+                continue
+            self.cancel(order.id)
+            if order.group is not None:
+                self.cancel_group(order.group)
+            fills.append((order, price))
+        return fills
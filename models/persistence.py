@@ -0,0 +1,88 @@
+import json
+
+import numpy as np
+
+from PJF.models.analytics import PortfolioAnalytics
+from PJF.models.orderbook import Order
+from PJF.models.portfolio import Portfolio
+from PJF.models.simulator import Simulator
+from PJF.models.stock import from_day, to_day
+from PJF.models.trading_calendar import TradingCalendar
+from PJF.models.transaction import Ledger, positions_state
+
+
+def _day_or_none(date):
+    return None if date is None else to_day(date)
+
+
+def _date_or_none(day):
+    return None if day is None else from_day(day)
+
+
+def save_run(path, portfolio, simulator):
+    # Jeden plik .npz: dziennik i historia jako tablice, reszta stanu jako JSON
+    pending = [
+        (order.stock.name, order.side, order.kind, order.price, order.shares,
+         order.good_till, order.reason)
+        for order in portfolio.orders.orders()
+        if order.group is None
+    ]
+    meta = {
+        "ledger": portfolio.ledger.to_meta(),
+        "analytics": portfolio.analytics.to_meta(),
+        "positions": positions_state(portfolio.positions),
+        "orders": pending,
+        "start_day": _day_or_none(simulator.start_date),
+        "current_day": _day_or_none(simulator.current_date),
+        "max_day": _day_or_none(simulator.max_date),
+    }
+
+    # Kalendarz przebiegu – bez rynku nie da się go odtworzyć z otwartych pozycji
+    calendar = simulator.calendar
+    calendar_days = calendar.days if calendar is not None else np.empty(0, np.int64)
+
+    with open(path, "wb") as f:
+        np.savez(
+            f,
+            # JSON jako bajty UTF-8 – tablica napisów numpy zajmuje 4 bajty na znak
+            meta=np.frombuffer(json.dumps(meta).encode("utf-8"), dtype=np.uint8),
+            history_days=portfolio.history.days,
+            history_values=portfolio.history.values,
+            calendar_days=calendar_days,
+            **portfolio.ledger.to_arrays(),
+            **portfolio.analytics.to_arrays()
+        )
+
+
+def load_run(path, stocks, market=None):
+    with np.load(path, allow_pickle=False) as saved:
+        arrays = {key: saved[key] for key in saved.files}
+    meta = arrays.pop("meta")
+    meta = json.loads(meta.tobytes().decode("utf-8") if meta.dtype == np.uint8 else str(meta))
+
+    portfolio = Portfolio(market)
+    portfolio.ledger = Ledger.from_saved(arrays, meta["ledger"])
+    portfolio.history.extend_days(arrays["history_days"], arrays["history_values"])
+
+    calendar = None
+    if market is None and len(arrays.get("calendar_days", ())):
+        calendar = TradingCalendar(arrays["calendar_days"])
+    simulator = Simulator(portfolio, calendar)
+    current_date = _date_or_none(meta["current_day"])
+
+    if current_date is not None:
+        portfolio.restore_positions(meta["positions"], current_date, stocks)
+        simulator.resume(
+            _date_or_none(meta["start_day"]), current_date, _date_or_none(meta["max_day"])
+        )
+
+    # Akumulatory analityki – bez nich miary liczyłyby się od zera po wznowieniu
+    if "analytics" in meta:
+        portfolio.analytics = PortfolioAnalytics.from_saved(arrays, meta["analytics"])
+
+    for name, side, kind, price, shares, good_till, reason in meta["orders"]:
+        order = Order(stocks[name], side, kind, price, shares, reason=reason)
+        order.good_till = good_till
+        portfolio.orders.place(order)
+
+    return portfolio, simulator
@@ -1,82 +1,163 @@
 import matplotlib
 matplotlib.use("QtAgg")
 import matplotlib.pyplot as plt
+import numpy as np
 
-
-# globalne uchwyty do okien
-_portfolio_fig = None
-_portfolio_ax = None
-_portfolio_line = None
-
-_stock_figs = {}   # {stock_name: (fig, ax, line)}
+from PJF.models.stock import to_day
 
 
-def plot_portfolio(portfolio, simulator):
-    global _portfolio_fig, _portfolio_ax, _portfolio_line
-
-    if not portfolio.history or simulator.current_date is None:
+# globalne uchwyty do okien
+_portfolio_chart = None
+
+_stock_charts = {}   # {stock_name: _LiveChart}
+
+
+def decimate_minmax(x, y, k):
+    # Dla każdego pełnego kubełka k punktów zostawiamy punkt minimalny i maksymalny –
+    # kształt wykresu na ekranie się nie zmienia, a punktów jest co najwyżej ~2 na piksel.
+    if k == 1:
+        return x, y
+
+    buckets = len(y) // k
+    block = y[:buckets * k].reshape(buckets, k)
+    base = np.arange(buckets) * k
+
+    idx = np.concatenate([base + block.argmin(axis=1), base + block.argmax(axis=1)])
+    idx.sort()
+    return x[idx], y[idx]
+
+
+class _LiveChart:
+    def __init__(self, title, xlabel, ylabel):
+        self.fig, self.ax = plt.subplots(figsize=(8, 4))
+        self.line, = self.ax.plot([], [], animated=True)
+        self.ax.set_title(title)
+        self.ax.set_xlabel(xlabel)
+        self.ax.set_ylabel(ylabel)
+        self.ax.xaxis_date()
+
+        self.background = None
+        self.count = 0
+        self.first = None
+        self.last = None
+
+        # Gotowe kubełki serii (po decymacji) i liczba punktów, które już do nich trafiły
+        self.width = None
+        self.folded = 0
+        self.kept_x = None
+        self.kept_y = None
+
+        self.fig.canvas.mpl_connect("draw_event", self._on_draw)
+        self.fig.show()
+
+    def _on_draw(self, event):
+        # Tło bez linii – kolejne klatki rysują tylko linię (blitting)
+        self.background = self.fig.canvas.copy_from_bbox(self.ax.bbox)
+        self.ax.draw_artist(self.line)
+
+    def _rescale(self, x, y):
+        # Zapas na osi X, żeby kolejne dni mieściły się bez pełnego przerysowania
+        span = max(float(x[-1] - x[0]), 1.0)
+        self.ax.set_xlim(float(x[0]), float(x[-1]) + 0.1 * span)
+
+        low, high = float(y.min()), float(y.max())
+        pad = (high - low) * 0.1 or abs(high) * 0.05 or 1.0
+        self.ax.set_ylim(low - pad, high + pad)
+
+    def _fits(self, x, y):
+        x0, x1 = self.ax.get_xlim()
+        y0, y1 = self.ax.get_ylim()
+        return x0 <= x.min() and x.max() <= x1 and y0 <= y.min() and y.max() <= y1
+
+    def _bucket_width(self, n):
+        # Potęga dwójki – zmienia się tylko po podwojeniu serii, więc pełna decymacja
+        # od nowa zdarza się rzadko (koszt zamortyzowany O(1) na punkt)
+        buckets = max(int(self.ax.bbox.width), 1)
+        k = 1
+        while n > 2 * buckets * k:
+            k *= 2
+        return k
+
+    def _fold(self, x, y):
+        # Dokłada do gotowych kubełków tylko punkty od ostatniego rysowania;
+        # niepełny ostatni kubełek idzie na wykres bez decymacji
+        k = self._bucket_width(len(x))
+        if self.count == 0 or k != self.width:
+            self.width = k
+            self.folded = 0
+            self.kept_x, self.kept_y = x[:0], y[:0]
+
+        complete = (len(x) - self.folded) // k * k
+        if complete:
+            end = self.folded + complete
+            bx, by = decimate_minmax(x[self.folded:end], y[self.folded:end], k)
+            self.kept_x = np.concatenate([self.kept_x, bx])
+            self.kept_y = np.concatenate([self.kept_y, by])
+            self.folded = end
+
+        return (
+            np.concatenate([self.kept_x, x[self.folded:]]),
+            np.concatenate([self.kept_y, y[self.folded:]]),
+        )
+
+    def update(self, x, y):
+        n = len(x)
+        if n == 0:
+            return
+        if n == self.count and x[0] == self.first and x[-1] == self.last:
+            return
+
+        # Nowy początek serii lub skrócenie – traktujemy jak pierwsze rysowanie
+        if x[0] != self.first or n < self.count:
+            self.count = 0
+
+        new_x, new_y = x[self.count:], y[self.count:]
+        line_x, line_y = self._fold(x, y)
+        self.line.set_data(line_x, line_y)
+
+        canvas = self.fig.canvas
+        if self.count and self.background is not None and self._fits(new_x, new_y):
+            canvas.restore_region(self.background)
+            self.ax.draw_artist(self.line)
+            canvas.blit(self.ax.bbox)
+        else:
+            # Minima i maksima kubełków zostają, więc zakres osi jest ten sam co dla całej serii
+            self._rescale(line_x, line_y)
+            self.background = None
+            canvas.draw_idle()
+
+        self.count = n
+        self.first = x[0]
+        self.last = x[-1]
+
+
+def plot_portfolio_series(days, values):
+    global _portfolio_chart
+
+    if len(days) == 0:
         return
 
-    dates = []
-    values = []
+    # jeśli okno nie istnieje – tworzymy je raz
+    if _portfolio_chart is None:
+        _portfolio_chart = _LiveChart("Wartość portfela", "Data", "Wartość [zł]")
 
-    for d, v in portfolio.history:
-        if d <= simulator.current_date:
-            dates.append(d)
-            values.append(v)
+    _portfolio_chart.update(days, values)
 
-    # jeśli okno nie istnieje – tworzymy je raz
-    if _portfolio_fig is None:
-        _portfolio_fig, _portfolio_ax = plt.subplots(figsize=(8, 4))
-        _portfolio_line, = _portfolio_ax.plot(dates, values)
-        _portfolio_ax.set_title("Wartość portfela")
-        _portfolio_ax.set_xlabel("Data")
-        _portfolio_ax.set_ylabel("Wartość [zł]")
-        _portfolio_fig.show()
-    else:
-        # tylko aktualizacja danych
-        _portfolio_line.set_data(dates, values)
-        _portfolio_ax.relim()
-        _portfolio_ax.autoscale_view()
-
-    _portfolio_fig.canvas.draw_idle()
-    _portfolio_fig.canvas.flush_events()
-
-
-def plot_stock(position, simulator):
-    global _stock_figs
-
-    if position.first_buy_date is None or simulator.current_date is None:
+
+def plot_stock_series(stock, first_buy_date, current_date):
+    if first_buy_date is None or current_date is None:
         return
 
-    stock = position.stock
-    start = position.first_buy_date
-    end = simulator.current_date
+    days = stock.days
 
-    data = stock.data[
-        (stock.data["date"] >= start) &
-        (stock.data["date"] <= end)
-    ]
+    lo = np.searchsorted(days, to_day(first_buy_date), side="left")
+    hi = np.searchsorted(days, to_day(current_date), side="right")
 
-    if data.empty:
+    if hi <= lo:
         return
 
-    dates = data["date"]
-    prices = data["close"]
-
     # jeśli dla tej spółki nie ma jeszcze okna – tworzymy
-    if stock.name not in _stock_figs:
-        fig, ax = plt.subplots(figsize=(8, 4))
-        line, = ax.plot(dates, prices)
-        ax.set_title(f"{stock.name}")
-        ax.set_xlabel("Data")
-        ax.set_ylabel("Cena [zł]")
-        fig.show()
-        _stock_figs[stock.name] = (fig, ax, line)
-    else:
-        fig, ax, line = _stock_figs[stock.name]
-        line.set_data(dates, prices)
-        ax.relim()
-        ax.autoscale_view()
-
-    fig.canvas.draw_idle()
\ No newline at end of file
+    if stock.name not in _stock_charts:
+        _stock_charts[stock.name] = _LiveChart(f"{stock.name}", "Data", "Cena [zł]")
+
+    _stock_charts[stock.name].update(days[lo:hi], stock.close[lo:hi])
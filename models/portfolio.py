@@ -1,29 +1,160 @@
+import numpy as np
+
+from PJF.models.analytics import PortfolioAnalytics
+from PJF.models.execution import STOP_LOSS, TAKE_PROFIT
+from PJF.models.history import PortfolioHistory
+from PJF.models.orderbook import BUY, LIMIT, SELL, STOP, Order, OrderBook
 from PJF.models.position import Position
+from PJF.models.stock import from_day
+from PJF.models.transaction import Ledger
+from PJF.models.valuation import PortfolioValuation
 
 
 class Portfolio:
-    def __init__(self):
+    def __init__(self, market=None):
+        self.market = market
         self.positions = {}
-        self.history = []
+        self.history = PortfolioHistory()
+        self.valuation = PortfolioValuation()
+        self.orders = OrderBook()
+        self.ledger = Ledger()
+        self.analytics = PortfolioAnalytics()
+        self._held = None
+
+    def _now(self, stock_name):
+        # Data bieżąca portfela; przed startem symulacji – dzień pierwszego zakupu
+        if self.valuation.date is not None:
+            return self.valuation.date
+        return self.positions[stock_name].first_buy_date
 
-    def buy(self, stock, shares, price, date):
+    def buy(self, stock, shares, price, date, reason=None):
         if stock.name not in self.positions:
             self.positions[stock.name] = Position(stock)
         self.positions[stock.name].buy(shares, price, date)
+        self.valuation.set_position(stock.name, self.positions[stock.name], price)
+        self.analytics.buy(shares * price)
+        self._held = None
+
+        self.ledger.record(stock.name, shares, price, date, BUY, reason)
+        self.ledger.maybe_snapshot(date, self.positions)
 
-    def sell(self, stock_name, shares):
+    def sell(self, stock_name, shares, price=None, date=None, reason=None):
         pos = self.positions[stock_name]
+        if price is None:
+            price = self.valuation.price(stock_name)
+        if date is None:
+            date = self._now(stock_name)
+
         pos.sell(shares)
+        self.analytics.sell(stock_name, shares, price, pos.avg_price)
         if pos.shares == 0:
-            del self.positions[stock_name]
+            self.close(stock_name)
+        else:
+            self.valuation.set_position(stock_name, pos)
+
+        self.ledger.record(stock_name, shares, price, date, SELL, reason)
+        self.ledger.maybe_snapshot(date, self.positions)
+
+    def close(self, stock_name):
+        del self.positions[stock_name]
+        self.valuation.remove(stock_name)
+        # SL / TP zamkniętej pozycji tracą sens
+        self.orders.cancel_group(stock_name)
+        self._held = None
 
     def set_sl_tp(self, stock_name, sl=None, tp=None):
         pos = self.positions[stock_name]
         pos.stop_loss = sl
         pos.take_profit = tp
+        self.valuation.set_position(stock_name, pos)
+
+        # W dzienniku tylko nowe poziomy tej pozycji; pełna migawka – co snapshot_every wpisów
+        date = self._now(stock_name)
+        self.ledger.record_levels(stock_name, sl, tp, date)
+        self.ledger.maybe_snapshot(date, self.positions)
+
+        # SL i TP jednej pozycji to para OCO – realizacja jednego anuluje drugie
+        self.orders.cancel_group(stock_name)
+        if sl is not None:
+            self.orders.place(Order(pos.stock, SELL, STOP, sl, group=stock_name, reason=STOP_LOSS))
+        if tp is not None:
+            self.orders.place(Order(pos.stock, SELL, LIMIT, tp, group=stock_name, reason=TAKE_PROFIT))
+
+    def place_order(self, stock, side, kind, price, shares=None, good_till=None, reason=None):
+        if side == SELL and stock.name not in self.positions:
+            raise ValueError("Nie masz tej spółki w portfelu.")
+        if side == BUY and not shares:
+            raise ValueError("Zlecenie kupna wymaga liczby akcji.")
+        return self.orders.place(Order(stock, side, kind, price, shares, good_till, reason=reason))
+
+    def cancel_order(self, order_id):
+        self.orders.cancel(order_id)
+
+    def restore_positions(self, state, date, stocks):
+        # Odtwarza pozycje (i ich SL / TP) ze stanu zapisanego w dzienniku, bez nowych wpisów
+        market = self.market
+        di = market.date_index(date) if market is not None else None
+
+        for name, shares, avg_price, first_day, sl, tp in state:
+            stock = stocks[name]
+            pos = self.positions[name] = Position(stock)
+            pos.shares = shares
+            pos.avg_price = avg_price
+            pos.first_buy_date = from_day(first_day)
+            pos.stop_loss = sl
+            pos.take_profit = tp
+
+            if market is not None:
+                price = market.price(di, market.ticker_index[name])
+            else:
+                price = stock.get_price_on_date(date)
+            self.valuation.set_position(name, pos, price)
+
+            if sl is not None:
+                self.orders.place(Order(stock, SELL, STOP, sl, group=name, reason=STOP_LOSS))
+            if tp is not None:
+                self.orders.place(Order(stock, SELL, LIMIT, tp, group=name, reason=TAKE_PROFIT))
+
+        self.valuation.set_date(date)
+        self.analytics.mark(self.valuation.total_value)
+        self._held = None
+
+    def at(self, date, stocks):
+        # Portfel z dnia date: najbliższa migawka + krótki ogon dziennika;
+        # dziennik zwracanego portfela to transakcje do dnia date włącznie.
+        # Odtwarzane są pozycje z SL / TP – pozostałe oczekujące zlecenia nie trafiają
+        # do dziennika, więc zwracany portfel ich nie ma.
+        portfolio = Portfolio(self.market)
+        portfolio.restore_positions(self.ledger.state_at(date), date, stocks)
+        portfolio.ledger = self.ledger.until(date)
+
+        days, values = self.history.range(end=date)
+        portfolio.history.extend_days(days, values)
+        return portfolio
+
+    def held(self):
+        # (nazwy pozycji, indeksy spółek w macierzy rynku) – przeliczane tylko po zmianie składu
+        if self._held is None:
+            names = list(self.positions)
+            self._held = (
+                names,
+                np.array([self.market.ticker_index[name] for name in names], dtype=np.int64)
+            )
+        return self._held
 
     def total_value(self, date):
+        if date == self.valuation.date:
+            return self.valuation.total_value
+
         value = 0
+
+        if self.market is not None:
+            di = self.market.date_index(date)
+            for name, pos in self.positions.items():
+                price = self.market.price(di, self.market.ticker_index[name])
+                value += pos.shares * price
+            return value
+
         for pos in self.positions.values():
             price = pos.stock.get_price_on_date(date)
             value += pos.shares * price
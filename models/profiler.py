@@ -0,0 +1,127 @@
+import functools
+import json
+import os
+import sys
+import threading
+import time
+from collections import deque
+
+
+# Mierzone metody: (moduł, klasa, metody, rodzaj).
+# "span" – czas każdego wywołania trafia do śladu (Chrome trace) i do sum;
+# "counter" – tylko liczba wywołań i łączny czas (metody wołane tysiące razy na takt).
+TARGETS = (
+    ("PJF.models.simulator", "Simulator", ("next_day", "update"), "span"),
+    ("PJF.models.stock", "Stock", ("get_price_on_date", "has_quote_on_date", "get_prices_on_dates"), "counter"),
+    ("PJF.models.market", "Market", ("price_on_date", "has_quote_on_date"), "counter"),
+    ("PJF.gui.app", "GPWSimulatorApp",
+     ("render", "update_company_box_for_current_date", "refresh", "redraw_charts"), "span"),
+)
+
+# Jeden takt symulacji – do przeliczenia sum na średnie na takt
+TICK = "Simulator.next_day"
+
+
+class Profiler:
+    # Wyłączony profiler nie kosztuje nic: pomiar to opakowania metod z TARGETS,
+    # zakładane w enable() i zdejmowane w disable(). Opakowywane są tylko klasy
+    # z modułów już zaimportowanych.
+
+    def __init__(self, max_events: int = 1_000_000):
+        self.enabled = False
+        self.events = deque(maxlen=max_events)     # (nazwa, wątek, start_ns, czas_ns)
+        self.totals = {}                           # {nazwa: [wywołania, czas_ns]} od włączenia
+        self.interval = {}                         # to samo od ostatniego breakdown()
+        self._originals = []
+        self._lock = threading.Lock()
+        self._origin = time.perf_counter_ns()
+
+    # ==========================================================
+
+    def _wrap(self, fn, name, trace):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter_ns()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                self._record(name, start, time.perf_counter_ns() - start, trace)
+        return wrapper
+
+    def _record(self, name, start, duration, trace):
+        with self._lock:
+            for table in (self.totals, self.interval):
+                entry = table.get(name)
+                if entry is None:
+                    entry = table[name] = [0, 0]
+                entry[0] += 1
+                entry[1] += duration
+            if trace:
+                self.events.append((name, threading.get_ident(), start, duration))
+
+    def enable(self):
+        if self.enabled:
+            return
+        for module_name, class_name, methods, kind in TARGETS:
+            module = sys.modules.get(module_name)
+            if module is None:
+                continue
+            cls = getattr(module, class_name)
+            for method in methods:
+                original = cls.__dict__[method]
+                self._originals.append((cls, method, original))
+                setattr(cls, method, self._wrap(original, f"{class_name}.{method}", kind == "span"))
+        self.enabled = True
+
+    def disable(self):
+        for cls, method, original in reversed(self._originals):
+            setattr(cls, method, original)
+        self._originals = []
+        self.enabled = False
+
+    def reset(self):
+        with self._lock:
+            self.events.clear()
+            self.totals = {}
+            self.interval = {}
+
+    # ==========================================================
+
+    def breakdown(self) -> dict:
+        # {nazwa: (wywołania, sekundy)} od poprzedniego wywołania; zeruje licznik okresu
+        with self._lock:
+            interval, self.interval = self.interval, {}
+        return {name: (calls, ns / 1e9) for name, (calls, ns) in interval.items()}
+
+    def format_breakdown(self, breakdown: dict) -> str:
+        # Czas na takt symulacji (średnio w okresie), od najdroższego etapu
+        ticks = breakdown.get(TICK, (0, 0.0))[0]
+        lines = [f"Takty: {ticks}"]
+        for name, (calls, seconds) in sorted(breakdown.items(), key=lambda item: -item[1][1]):
+            per_tick = f", {seconds / ticks * 1000:.3f} ms/takt" if ticks else ""
+            lines.append(f"{name}: {seconds * 1000:.2f} ms, {calls}×{per_tick}")
+        return "\n".join(lines)
+
+    def export_chrome_trace(self, path: str):
+        # Format "Trace Event" (chrome://tracing, Perfetto): zdarzenia "X" w mikrosekundach
+        with self._lock:
+            events = list(self.events)
+            totals = dict(self.totals)
+
+        pid = os.getpid()
+        trace = [
+            {
+                "name": name, "cat": "pjf", "ph": "X", "pid": pid, "tid": tid,
+                "ts": (start - self._origin) / 1000, "dur": duration / 1000,
+            }
+            for name, tid, start, duration in events
+        ]
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({
+                "traceEvents": trace,
+                "displayTimeUnit": "ms",
+                "otherData": {name: {"calls": c, "ms": ns / 1e6} for name, (c, ns) in totals.items()},
+            }, f)
+
+
+profiler = Profiler()
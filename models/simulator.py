@@ -1,70 +1,192 @@
-from datetime import timedelta
-from typing import Any
+import numpy as np
+
+from PJF.models.execution import Fill
+from PJF.models.orderbook import BUY
+from PJF.models.stock import to_day
+from PJF.models.trading_calendar import TradingCalendar
 
 
 class Simulator:
-    def __init__(self, portfolio):
+    def __init__(self, portfolio, calendar: TradingCalendar | None = None):
         self.portfolio = portfolio
+        if calendar is None and portfolio.market is not None:
+            calendar = portfolio.market.calendar
+        self.calendar = calendar
+
+        # Symulacja przechodzi po indeksach kalendarza sesji; current_date to data sesji day_index
+        self.day_index = None
+        self.max_index = None
         self.current_date = None
         self.start_date = None
         self.max_date = None
+        self.last_fills = []
 
     def start(self, date):
+        if self.calendar is None:
+            self.calendar = TradingCalendar.from_stocks(
+                pos.stock for pos in self.portfolio.positions.values()
+            )
         self.start_date = date
         self.current_date = date
+        self.day_index = self.calendar.index_of(date)
         self.recalculate_max_date()
 
+    def resume(self, start_date, current_date, max_date):
+        self.start(start_date)
+        self.current_date = current_date
+        self.day_index = self.calendar.index_of(current_date)
+        self.max_date = max_date
+        self.max_index = None if max_date is None else self.calendar.index_of(max_date)
+
     def recalculate_max_date(self):
         if not self.portfolio.positions:
             self.max_date = None
+            self.max_index = None
             return
 
         self.max_date = min(
-            pos.stock.data.iloc[-1]["date"]
+            pos.stock.last_date
             for pos in self.portfolio.positions.values()
         )
+        self.max_index = self.calendar.index_of(self.max_date)
+
+    @property
+    def finished(self):
+        return (
+            self.day_index is None or self.max_index is None
+            or self.day_index >= self.max_index
+        )
 
     def next_day(self):
-        if self.current_date is None or self.max_date is None:
-            return
-        if self.current_date >= self.max_date:
+        if self.finished:
             return
 
-        next_date: timedelta | Any = self.current_date + timedelta(days=1)
-
-        while next_date.weekday() >= 5:
-            next_date += timedelta(days=1)
-
-        self.current_date = next_date
+        self.day_index += 1
+        self.current_date = self.calendar.date(self.day_index)
         self.update()
 
-    def update(self):
-        total = 0
-        to_close = []
-
-        for name, pos in self.portfolio.positions.items():
-
-            # Cena zawsze istnieje (z ostatniej sesji)
-            price = pos.stock.get_price_on_date(self.current_date)
-
-            # Jeżeli to NIE jest dzień sesyjny dla tej spółki, nie sprawdzamy SL/TP
-            if not pos.stock.has_quote_on_date(self.current_date):
-                total += pos.shares * price
-                continue
-
-            # Tylko w dniu rzeczywistej sesji sprawdzamy zlecenia
-
-            if pos.stop_loss is not None and price <= pos.stop_loss:
-                to_close.append(name)
-                continue
+    def run_until(self, date):
+        # Przewijanie do date (włącznie) w jednej pętli – te same kroki co next_day,
+        # z realizacją zleceń i zapisem historii dla każdego dnia. Gdy date nie jest
+        # sesją, kończymy na ostatniej sesji przed nią.
+        fills = []
+        steps = 0
+        target = to_day(date)
+        while not self.finished and self.calendar.days[self.day_index + 1] <= target:
+            self.next_day()
+            fills += self.last_fills
+            steps += 1
+        self.last_fills = fills
+        return steps
+
+    def skip(self, sessions):
+        fills = []
+        steps = 0
+        while not self.finished and steps < sessions:
+            self.next_day()
+            fills += self.last_fills
+            steps += 1
+        self.last_fills = fills
+        return steps
+
+    def _market_day(self, market):
+        # Wiersz rynku dla bieżącego dnia (None, gdy rynek nie miał tego dnia sesji)
+        if self.calendar is market.calendar:
+            return market.day(self.day_index)
+        di = market.date_index(self.current_date)
+        return market.day(di) if market.is_session(di, self.current_date) else None
+
+    def _order_sessions(self, tickers, day):
+        # Spółki z aktywnymi zleceniami, które miały dziś sesję: (nazwa, otwarcie, maksimum, minimum)
+        # Stała kolejność spółek – od niej zależy, które zlecenie pierwsze zużyje gotówkę
+        market = self.portfolio.market
+        names = sorted(tickers)
+
+        if market is None:
+            for name in names:
+                stock = self.portfolio.orders.stock(name)
+                if stock.has_quote_on_date(self.current_date):
+                    i = np.searchsorted(stock.days, to_day(self.current_date))
+                    yield (
+                        name, float(stock.column("open")[i]),
+                        float(stock.column("high")[i]), float(stock.column("low")[i])
+                    )
+            return
 
-            if pos.take_profit is not None and price >= pos.take_profit:
-                to_close.append(name)
-                continue
+        if day is None:
+            return
 
-            total += pos.shares * price
+        columns = np.array([market.ticker_index[name] for name in names], dtype=np.int64)
+        traded = np.flatnonzero(day.quoted[columns])
+        columns = columns[traded]
 
-        for name in to_close:
-            del self.portfolio.positions[name]
+        yield from zip(
+            [names[k] for k in traded.tolist()],
+            day.session("open")[columns].tolist(),
+            day.session("high")[columns].tolist(),
+            day.session("low")[columns].tolist(),
+        )
 
-        self.portfolio.history.append((self.current_date, total))
+    def _sessions(self, day):
+        # Pozycje, których spółka miała dziś sesję: (nazwy, ceny zamknięcia).
+        # W pozostałe dni cena jest dziedziczona z ostatniej sesji, więc nic się nie zmienia.
+        market = self.portfolio.market
+
+        if market is None:
+            names, close = [], []
+            for name, pos in self.portfolio.positions.items():
+                if pos.stock.has_quote_on_date(self.current_date):
+                    names.append(name)
+                    close.append(pos.stock.get_price_on_date(self.current_date))
+            return names, close
+
+        if day is None:
+            return [], []
+
+        names, tickers = self.portfolio.held()
+        traded = np.flatnonzero(day.quoted[tickers])
+
+        return [names[k] for k in traded.tolist()], day.close[tickers[traded]].tolist()
+
+    def _execute(self, order, price):
+        name = order.stock.name
+
+        if order.side == BUY:
+            shares = order.shares
+            self.portfolio.buy(order.stock, shares, price, self.current_date, order.reason)
+        else:
+            pos = self.portfolio.positions.get(name)
+            if pos is None:
+                return
+            shares = pos.shares if order.shares is None else min(order.shares, pos.shares)
+            self.portfolio.sell(name, shares, price, self.current_date, order.reason)
+
+        self.last_fills.append(Fill(self.current_date, name, shares, price, order.reason))
+
+    def update(self, day=None):
+        # day – wiersz rynku (MarketDay) podany z zewnątrz, np. wspólny dla wielu portfeli
+        valuation = self.portfolio.valuation
+        orders = self.portfolio.orders
+        market = self.portfolio.market
+        self.last_fills = []
+
+        if market is not None and day is None:
+            day = self._market_day(market)
+
+        orders.expire(self.current_date)
+
+        # Tylko w dniu rzeczywistej sesji sprawdzamy zlecenia – na podstawie otwarcia,
+        # minimum i maksimum sesji, i tylko te, których cena mieści się w zakresie sesji
+
+        if orders:
+            for name, open_, high, low in self._order_sessions(orders.tickers(), day):
+                for order, price in orders.match(name, open_, high, low):
+                    self._execute(order, price)
+
+        for name, price in zip(*self._sessions(day)):
+            valuation.update_price(name, price)
+
+        valuation.set_date(self.current_date)
+        today = self.calendar.days[self.day_index]
+        self.portfolio.history.append_day(today, valuation.total_value)
+        self.portfolio.analytics.close_day(today, valuation.total_value)
@@ -1,40 +1,220 @@
+import threading
+from collections import OrderedDict
+
+import numpy as np
 import pandas as pd
-from datetime import datetime
+from datetime import date as date_type, datetime
+
+from PJF.models.cache import DataCache, ROW, read_csv_columns
+
+
+_EPOCH_ORDINAL = date_type(1970, 1, 1).toordinal()
+
+
+def to_day(date) -> int:
+    # Dzień jako liczba dni od 1970-01-01 (tak samo jak datetime64[D])
+    if isinstance(date, np.datetime64):
+        return int(date.astype("datetime64[D]").astype(np.int64))
+    if isinstance(date, datetime):
+        date = date.date()
+    return date.toordinal() - _EPOCH_ORDINAL
+
+
+def to_days(dates) -> np.ndarray:
+    values = pd.DatetimeIndex(dates).values
+    return values.astype("datetime64[D]").astype(np.int64)
+
+
+def from_day(day: int) -> datetime:
+    return datetime.fromordinal(int(day) + _EPOCH_ORDINAL)
+
+
+DEFAULT_MEMORY_BUDGET = 64 * 1024 * 1024
+
+
+class StockLRU:
+    def __init__(self, max_bytes: int = DEFAULT_MEMORY_BUDGET):
+        self.max_bytes = max_bytes
+        self.resident_bytes = 0
+        self._loaded = OrderedDict()   # {id(stock): (stock, nbytes)}
+        # Spółki czyta zarówno wątek symulacji, jak i wątek GUI (wykresy)
+        self._lock = threading.Lock()
+
+    def touch(self, stock):
+        with self._lock:
+            self._touch(stock)
+
+    def _touch(self, stock):
+        key = id(stock)
+        entry = self._loaded.get(key)
+
+        if entry is not None and entry[1] == stock.nbytes:
+            self._loaded.move_to_end(key)
+        else:
+            if entry is not None:
+                self.resident_bytes -= entry[1]
+                del self._loaded[key]
+            self._loaded[key] = (stock, stock.nbytes)
+            self.resident_bytes += stock.nbytes
+
+        # Wyrzucamy najdawniej używane spółki, ale nigdy tej właśnie dotkniętej
+        while self.resident_bytes > self.max_bytes and len(self._loaded) > 1:
+            _, (old, nbytes) = self._loaded.popitem(last=False)
+            self.resident_bytes -= nbytes
+            old.unload()
+
+    def forget(self, stock):
+        with self._lock:
+            entry = self._loaded.pop(id(stock), None)
+            if entry is not None:
+                self.resident_bytes -= entry[1]
+
+    def __len__(self):
+        return len(self._loaded)
 
 
 class Stock:
-    def __init__(self, name: str, csv_path: str):
+    def __init__(self, name: str, csv_path: str, cache: DataCache | None = None,
+                 lru: StockLRU | None = None):
         self.name = name
         self.csv_path = csv_path
+        self.cache = cache
+        self.lru = lru
 
-        self.data = pd.read_csv(csv_path, sep=";")
-        self.data.columns = self.data.columns.str.strip().str.lower()
+        # (kolumny, dni, zamknięcia, maska sesji) – jedna krotka podmieniana w całości,
+        # więc wątek czytający nigdy nie zobaczy danych wyładowanych w połowie
+        self._state = None
+        self._data = None
 
-        self.data.rename(columns={
-            "data": "date",
-            "zamkniecie": "close"
-        }, inplace=True)
+        if cache is not None:
+            # Metadane z manifestu – bez wczytywania szeregu
+            meta = cache.metadata(csv_path)
+            self.rows = meta["rows"]
+            self.first_day = meta["first_day"]
+            self.last_day = meta["last_day"]
+        else:
+            days = self._load()[1]
+            self.rows = len(days)
+            self.first_day = int(days[0]) if self.rows else None
+            self.last_day = int(days[-1]) if self.rows else None
 
-        self.data["date"] = pd.to_datetime(self.data["date"])
-        self.data.sort_values("date", inplace=True)
+    # ==========================================================
+
+    def _load(self):
+        if self.cache is not None:
+            columns = self.cache.load(self.csv_path)
+        else:
+            columns = read_csv_columns(self.csv_path)
+
+        # Posortowany indeks dni sesyjnych i ceny zamknięcia do wyszukiwania binarnego
+        days = columns[ROW["day"]].astype(np.int64)
+        close = columns[ROW["close"]]
+
+        # Kalendarz sesji jako maska bitowa od pierwszego notowania
+        first_day = int(days[0]) if len(days) else 0
+        sessions = np.zeros(int(days[-1]) - first_day + 1 if len(days) else 0, dtype=bool)
+        sessions[days - first_day] = True
+
+        state = self._state = (columns, days, close, sessions)
+        return state
+
+    def _arrays(self):
+        # Zwracamy krotkę przeczytaną raz – wyładowanie w innym wątku jej nie zmieni
+        state = self._state
+        if state is None:
+            state = self._load()
+        if self.lru is not None:
+            self.lru.touch(self)
+        return state
+
+    def unload(self):
+        # Bez cache nie ma skąd tanio wczytać danych ponownie
+        if self.cache is None:
+            return
+        self._state = None
+        self._data = None
+
+    @property
+    def loaded(self) -> bool:
+        return self._state is not None
+
+    @property
+    def nbytes(self) -> int:
+        state, data = self._state, self._data
+        if state is None:
+            return 0
+        columns, days, _, sessions = state
+        total = days.nbytes + sessions.nbytes
+        # Tablice zmapowane z pliku trzyma system w page cache, nie proces
+        if not isinstance(columns, np.memmap):
+            total += columns.nbytes
+        if data is not None:
+            total += int(data.memory_usage(index=False).sum())
+        return total
+
+    # ==========================================================
+
+    @property
+    def days(self) -> np.ndarray:
+        return self._arrays()[1]
+
+    @property
+    def close(self) -> np.ndarray:
+        return self._arrays()[2]
+
+    def column(self, name: str) -> np.ndarray:
+        return self._arrays()[0][ROW[name]]
+
+    @property
+    def data(self) -> pd.DataFrame:
+        _, days, close, _ = self._arrays()
+        data = self._data
+        if data is None:
+            # Aplikacja czyta tylko datę i zamknięcie
+            data = self._data = pd.DataFrame({
+                "date": days.astype("datetime64[D]").astype("datetime64[ns]"),
+                "close": close,
+            })
+            if self.lru is not None:
+                self.lru.touch(self)
+        return data
+
+    @property
+    def first_date(self) -> datetime:
+        return from_day(self.first_day)
+
+    @property
+    def last_date(self) -> datetime:
+        return from_day(self.last_day)
+
+    # ==========================================================
 
     def has_quote_on_date(self, date):
-        target = date.date()
-        available_dates = self.data["date"].dt.normalize().dt.date
-        return target in available_dates.values
+        offset = to_day(date) - self.first_day
+        if offset < 0 or self.last_day - self.first_day < offset:
+            return False
+        return bool(self._arrays()[3][offset])
 
     def get_price_on_date(self, date: datetime) -> float:
 
         #    Weekendy i dni bez notowań dziedziczą cenę z ostatniej sesji.
 
-        target = date.date()
+        _, days, close, _ = self._arrays()
+        i = np.searchsorted(days, to_day(date), side="right") - 1
+
+        if i < 0:
+            raise ValueError("Brak notowań przed tą datą.")
+
+        return float(close[i])
 
-        filtered = self.data[self.data["date"].dt.date <= target]
+    def get_prices_on_dates(self, dates) -> np.ndarray:
+        _, days, close, _ = self._arrays()
+        idx = np.searchsorted(days, to_days(dates), side="right") - 1
 
-        if filtered.empty:
+        if idx.size and idx.min() < 0:
             raise ValueError("Brak notowań przed tą datą.")
 
-        return float(filtered.iloc[-1]["close"])
+        return close[idx]
 
     def get_latest_price(self):
-        return float(self.data.iloc[-1]["close"])
+        return float(self.close[-1])
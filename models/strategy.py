@@ -0,0 +1,223 @@
+from typing import NamedTuple
+
+import numpy as np
+
+from PJF.models.batch import BatchSimulator
+from PJF.models.indicators import Indicators
+from PJF.models.orderbook import BUY, LIMIT, SELL
+
+
+# Zlecenie po najbliższym otwarciu – w księdze to LIMIT bez ograniczenia ceny
+MARKET = "MARKET"
+
+
+class StrategyOrder(NamedTuple):
+    ticker: str
+    side: str                       # BUY / SELL
+    shares: int | None = None       # SELL bez liczby akcji – cała pozycja
+    kind: str = MARKET              # MARKET, LIMIT lub STOP
+    price: float | None = None
+    good_till: object = None
+
+
+class StopLevels(NamedTuple):
+    # Ustawienie (lub usunięcie – None) SL / TP posiadanej pozycji
+    ticker: str
+    stop_loss: float | None = None
+    take_profit: float | None = None
+
+
+def buy(ticker, shares, kind=MARKET, price=None, good_till=None):
+    return StrategyOrder(ticker, BUY, shares, kind, price, good_till)
+
+
+def sell(ticker, shares=None, kind=MARKET, price=None, good_till=None):
+    return StrategyOrder(ticker, SELL, shares, kind, price, good_till)
+
+
+class CloseWindow:
+    # Ostatnie `length` wierszy cen zamknięcia całego rynku w buforze cyklicznym:
+    # nowa sesja nadpisuje jeden wiersz (O(spółek)), bez kopiowania historii
+
+    def __init__(self, length, n):
+        self.length = length
+        self.rows = np.full((max(length, 1), n), np.nan)
+        self.count = 0
+
+    def push(self, row):
+        if self.length:
+            self.rows[self.count % self.length] = row
+        self.count += 1
+
+    def last(self, k=None) -> np.ndarray:
+        # (k × spółki), od najstarszego do bieżącego wiersza
+        k = min(self.length if k is None else k, self.length, self.count)
+        return self.rows[(self.count - k + np.arange(k)) % self.length]
+
+
+class MarketSnapshot:
+    # To, co strategia widzi w danym dniu: bieżący wiersz rynku, okno ostatnich sesji
+    # i własny portfel (tylko do odczytu). Nic z dni późniejszych.
+    __slots__ = ("date", "day", "window", "portfolio", "_runner", "_market")
+
+    def __init__(self, date, day, window, portfolio, runner):
+        self.date = date
+        self.day = day
+        self.window = window
+        self.portfolio = portfolio
+        self._runner = runner
+        self._market = runner.market
+
+    @property
+    def tickers(self):
+        return self._market.tickers
+
+    def column(self, ticker) -> int:
+        return self._market.ticker_index[ticker]
+
+    def close(self, ticker) -> float:
+        return float(self.day.close[self._market.ticker_index[ticker]])
+
+    def quoted(self, ticker) -> bool:
+        return bool(self.day.quoted[self._market.ticker_index[ticker]])
+
+    def shares(self, ticker) -> int:
+        pos = self.portfolio.positions.get(ticker)
+        return 0 if pos is None else pos.shares
+
+    def screen(self, **kwargs):
+        # Wskaźniki całego rynku na ten dzień – liczone raz dla wszystkich strategii
+        return self._runner.indicators.screen(self.date, **kwargs)
+
+
+class Strategy:
+    # Strategia skryptowa: on_day dostaje MarketSnapshot po zamknięciu sesji
+    # i zwraca (lub generuje) zlecenia; realizują się od następnej sesji.
+    window = 0          # ile ostatnich sesji ma trafiać do snapshot.window
+
+    def on_start(self, snapshot):
+        return ()
+
+    def on_day(self, snapshot):
+        return ()
+
+    def on_fill(self, fill):
+        pass
+
+
+class StrategyRunner:
+    # Pętla zdarzeń po kalendarzu sesji dla wielu strategii naraz – każda ma własny
+    # portfel w BatchSimulator, a wszystkie czytają ten sam rynek i to samo okno cen.
+
+    def __init__(self, market, strategies, start, end=None):
+        self.market = market
+        self.strategies = dict(strategies)
+        self.batch = BatchSimulator(market)
+        for name in self.strategies:
+            self.batch.add(name)
+
+        self.start = start
+        self.end = end
+        self.window = CloseWindow(
+            max((s.window for s in self.strategies.values()), default=0), len(market.tickers)
+        )
+        self._indicators = None
+
+    @property
+    def indicators(self):
+        if self._indicators is None:
+            self._indicators = Indicators(self.market)
+        return self._indicators
+
+    def _submit(self, portfolio, order):
+        if isinstance(order, StopLevels):
+            if order.ticker in portfolio.positions:
+                portfolio.set_sl_tp(order.ticker, order.stop_loss, order.take_profit)
+            return
+
+        stock = self.market.stocks[order.ticker]
+        kind, price = order.kind, order.price
+        if kind == MARKET:
+            kind, price = LIMIT, float("inf") if order.side == BUY else 0.0
+        portfolio.place_order(
+            stock, order.side, kind, price, order.shares, order.good_till, reason=order.kind
+        )
+
+    def _notify(self, first):
+        batch = self.batch
+        fills = batch.fills() if not first else {}
+
+        for name, strategy in self.strategies.items():
+            portfolio = batch.portfolio(name)
+            for fill in fills.get(name, ()):
+                strategy.on_fill(fill)
+
+            snapshot = MarketSnapshot(batch.current_date, batch.day, self.window, portfolio, self)
+            orders = strategy.on_start(snapshot) if first else strategy.on_day(snapshot)
+            for order in orders or ():
+                self._submit(portfolio, order)
+        return fills
+
+    def events(self):
+        # Generator: po każdej sesji (data, {strategia: [Fill, ...]}).
+        # Przerwanie iteracji zatrzymuje symulację w bieżącym dniu.
+        batch = self.batch
+        batch.start(self.start, self.end)
+        if batch.day_index < 0:
+            return
+
+        # Okno wypełnione sesjami sprzed startu – strategie mają historię od pierwszego dnia
+        first = max(batch.day_index - self.window.length + 1, 0)
+        for i in range(first, batch.day_index + 1):
+            self.window.push(self.market.close[i])
+
+        self._notify(first=True)
+        while not batch.finished:
+            batch.next_day()
+            self.window.push(batch.day.close)
+            yield batch.current_date, self._notify(first=False)
+
+    def run(self):
+        for _ in self.events():
+            pass
+        return self.batch.summary()
+
+
+class SmaCrossover(Strategy):
+    # Przykład: kupno, gdy średnia krótka przetnie długą od dołu, sprzedaż – gdy od góry;
+    # stała kwota na pozycję. Średnie liczone naraz dla wszystkich spółek z listy.
+    def __init__(self, tickers, short=20, long=50, budget=10_000.0):
+        self.tickers = list(tickers)
+        self.short = short
+        self.long = long
+        self.budget = budget
+        self.window = long
+        self.columns = None
+        self.above = None
+
+    def on_start(self, snapshot):
+        self.columns = np.array([snapshot.column(t) for t in self.tickers], dtype=np.int64)
+        return ()
+
+    def on_day(self, snapshot):
+        rows = snapshot.window.last(self.long)[:, self.columns]
+        if len(rows) < self.long:
+            return
+
+        above = rows[-self.short:].mean(axis=0) > rows.mean(axis=0)
+        previous, self.above = self.above, above
+        if previous is None:
+            return
+
+        complete = ~np.isnan(rows).any(axis=0)
+        crossed = (above != previous) & complete & snapshot.day.quoted[self.columns]
+
+        for k in np.flatnonzero(crossed).tolist():
+            ticker = self.tickers[k]
+            held = snapshot.shares(ticker)
+            if above[k] and not held:
+                shares = int(self.budget // rows[-1, k])
+                if shares:
+                    yield buy(ticker, shares)
+            elif not above[k] and held:
+                yield sell(ticker)
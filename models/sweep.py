@@ -0,0 +1,123 @@
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from itertools import product
+
+import numpy as np
+import pandas as pd
+
+from PJF.models.backtest import Quotes, first_trigger, price_columns
+from PJF.models.stock import from_day, to_day
+from PJF.models.trading_calendar import TradingCalendar
+
+
+# Dane współdzielone przez procesy robocze (tylko do odczytu, mapowane z pliku)
+_shared = {}
+
+
+def _init_worker(shared_dir):
+    _shared["prices"] = np.load(os.path.join(shared_dir, "prices.npy"), mmap_mode="r")
+    _shared["quoted"] = np.load(os.path.join(shared_dir, "quoted.npy"), mmap_mode="r")
+    _shared["days"] = np.load(os.path.join(shared_dir, "days.npy"), mmap_mode="r")
+
+
+def _max_drawdown(values):
+    peak = np.maximum.accumulate(values)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        drawdown = np.where(peak > 0, (peak - values) / peak, 0.0)
+    return float(drawdown.max()) if len(drawdown) else 0.0
+
+
+def _run_entry(task):
+    entry_row, entry_prices, shares, names, grid = task
+    # prices: (close, open, high, low) × dni × pozycje
+    prices = _shared["prices"][:, entry_row:]
+    quoted = _shared["quoted"][entry_row:]
+    days = _shared["days"][entry_row:]
+    rows = np.arange(len(days))
+
+    results = []
+    for sl, tp in grid:
+        values = np.zeros(len(days))
+        exits = {}
+
+        for j, name in enumerate(names):
+            quotes = Quotes(*prices[:, :, j], quoted[:, j])
+            stop_loss = entry_prices[j] * sl if sl is not None else None
+            take_profit = entry_prices[j] * tp if tp is not None else None
+
+            exit_row, fill_price, _ = first_trigger(quotes, stop_loss, take_profit)
+            held = rows < exit_row
+            values += np.where(held, shares[j] * quotes.close, 0.0)
+
+            # Po zamknięciu pozycji liczymy środki ze sprzedaży po cenie realizacji zlecenia
+            if exit_row < len(days):
+                values += np.where(held, 0.0, shares[j] * fill_price)
+                exits[name] = from_day(days[exit_row])
+            else:
+                exits[name] = None
+
+        results.append({
+            "stop_loss": sl,
+            "take_profit": tp,
+            "final_value": float(values[-1]) if len(values) else 0.0,
+            "max_drawdown": _max_drawdown(values),
+            "exit_dates": exits,
+        })
+
+    return results
+
+
+def sweep_sl_tp(stocks, holdings, entry_dates, stop_losses, take_profits,
+                end=None, processes=None, calendar=None) -> pd.DataFrame:
+    # holdings: {nazwa spółki: ilość akcji}. Poziomy SL/TP podawane są względem
+    # ceny wejścia (np. 0.9 = stop loss 10% poniżej), None = brak zlecenia.
+    names = list(holdings)
+    shares = np.array([holdings[name] for name in names], dtype=np.float64)
+    entry_dates = sorted(entry_dates)
+
+    last_day = min(stocks[name].last_day for name in names)
+    if end is not None:
+        last_day = min(last_day, to_day(end))
+
+    if calendar is None:
+        calendar = TradingCalendar.from_stocks(stocks.values())
+    days = calendar.between(entry_dates[0], from_day(last_day))
+
+    prices = np.empty((4, len(days), len(names)))
+    quoted = np.empty((len(days), len(names)), dtype=bool)
+    for j, name in enumerate(names):
+        quotes = price_columns(stocks[name], days)
+        prices[:, :, j] = quotes[:4]
+        quoted[:, j] = quotes.quoted
+
+    grid = list(product(stop_losses, take_profits))
+    tasks = []
+    for entry in entry_dates:
+        entry_row = int(np.searchsorted(days, to_day(entry), side="right"))
+        entry_prices = [stocks[name].get_price_on_date(entry) for name in names]
+        tasks.append((entry_row, entry_prices, shares, names, grid))
+
+    with tempfile.TemporaryDirectory() as shared_dir:
+        np.save(os.path.join(shared_dir, "prices.npy"), prices)
+        np.save(os.path.join(shared_dir, "quoted.npy"), quoted)
+        np.save(os.path.join(shared_dir, "days.npy"), days)
+
+        if processes == 1:
+            _init_worker(shared_dir)
+            chunks = [_run_entry(task) for task in tasks]
+            _shared.clear()
+        else:
+            with ProcessPoolExecutor(processes, initializer=_init_worker,
+                                     initargs=(shared_dir,)) as pool:
+                chunks = list(pool.map(_run_entry, tasks))
+
+    rows = []
+    for entry, chunk in zip(entry_dates, chunks):
+        for result in chunk:
+            rows.append({"entry_date": entry, **result})
+
+    return pd.DataFrame(rows, columns=[
+        "entry_date", "stop_loss", "take_profit",
+        "final_value", "max_drawdown", "exit_dates"
+    ])
@@ -0,0 +1,40 @@
+import numpy as np
+
+from PJF.models.stock import from_day, to_day
+
+
+# Przybliżona liczba sesji w roku – do przeliczania miar dziennych na roczne
+SESSIONS_PER_YEAR = 252
+
+
+class TradingCalendar:
+    # Dni sesyjne giełdy (int64, dni od 1970-01-01), posortowane rosnąco
+    def __init__(self, days):
+        self.days = np.asarray(days, dtype=np.int64)
+
+    @classmethod
+    def from_stocks(cls, stocks):
+        days = [stock.days for stock in stocks]
+        return cls(np.unique(np.concatenate(days)) if days else np.empty(0, np.int64))
+
+    def __len__(self):
+        return len(self.days)
+
+    def index_of(self, date) -> int:
+        # Indeks ostatniej sesji <= date (-1 przed pierwszą sesją)
+        return int(np.searchsorted(self.days, to_day(date), side="right")) - 1
+
+    def index_after(self, date) -> int:
+        # Indeks pierwszej sesji > date
+        return int(np.searchsorted(self.days, to_day(date), side="right"))
+
+    def is_session(self, date) -> bool:
+        i = self.index_of(date)
+        return i >= 0 and self.days[i] == to_day(date)
+
+    def date(self, index: int):
+        return from_day(self.days[index])
+
+    def between(self, start, end) -> np.ndarray:
+        # Sesje z przedziału (start, end]
+        return self.days[self.index_after(start):self.index_of(end) + 1]
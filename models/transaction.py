@@ -1,7 +1,250 @@
+from bisect import bisect_right
+
+import numpy as np
+
+from PJF.models.orderbook import BUY, SELL
+from PJF.models.stock import from_day, to_day
+
+
+_TYPES = (BUY, SELL)
+
+
 class Transaction:
-    def __init__(self, stock_name, shares, price, date, type_):
+    __slots__ = ("stock_name", "shares", "price", "date", "type", "reason")
+
+    def __init__(self, stock_name, shares, price, date, type_, reason=None):
         self.stock_name = stock_name
         self.shares = shares
         self.price = price
         self.date = date
         self.type = type_  # "BUY" lub "SELL"
+        self.reason = reason
+
+    def __repr__(self):
+        return (
+            f"Transaction({self.type} {self.stock_name} {self.shares} @ {self.price} "
+            f"{self.date:%Y-%m-%d})"
+        )
+
+
+class Ledger:
+    # Dziennik transakcji w tablicach kolumnowych (tylko dopisywanie) + migawki stanu
+    # portfela co snapshot_every wpisów. Stan z dowolnego dnia = najbliższa
+    # wcześniejsza migawka + odtworzenie krótkiego ogona dziennika.
+    # Zmiany SL / TP to osobne, małe wpisy (tylko poziomy jednej pozycji).
+
+    def __init__(self, snapshot_every: int = 64, capacity: int = 64):
+        self.snapshot_every = snapshot_every
+        self.names = []
+        self._name_index = {}
+        self.reasons = [None]
+        self._reason_index = {None: 0}
+        self._size = 0
+        self._day = np.empty(capacity, dtype=np.int64)
+        self._ticker = np.empty(capacity, dtype=np.int32)
+        self._shares = np.empty(capacity, dtype=np.int64)
+        self._price = np.empty(capacity, dtype=np.float64)
+        self._type = np.empty(capacity, dtype=np.int8)
+        self._reason = np.empty(capacity, dtype=np.int16)
+
+        # Zmiany SL / TP: dzień + (liczba transakcji przed zmianą, spółka, SL, TP)
+        self.level_days = []
+        self.levels = []
+
+        # Migawki: dzień + (liczba transakcji, liczba zmian SL / TP, stan pozycji)
+        self.snapshot_days = [np.iinfo(np.int64).min]
+        self.snapshots = [(0, 0, [])]
+
+    # ==========================================================
+
+    def _grow(self):
+        capacity = 2 * max(len(self._day), 1)
+        for attr in ("_day", "_ticker", "_shares", "_price", "_type", "_reason"):
+            old = getattr(self, attr)
+            new = np.empty(capacity, dtype=old.dtype)
+            new[:self._size] = old[:self._size]
+            setattr(self, attr, new)
+
+    def _code(self, table, index, value):
+        code = index.get(value)
+        if code is None:
+            code = index[value] = len(table)
+            table.append(value)
+        return code
+
+    def record(self, stock_name, shares, price, date, type_, reason=None):
+        if self._size == len(self._day):
+            self._grow()
+
+        i = self._size
+        self._day[i] = to_day(date)
+        self._ticker[i] = self._code(self.names, self._name_index, stock_name)
+        self._shares[i] = shares
+        self._price[i] = price
+        self._type[i] = _TYPES.index(type_)
+        self._reason[i] = self._code(self.reasons, self._reason_index, reason)
+        self._size += 1
+
+    def record_levels(self, stock_name, stop_loss, take_profit, date):
+        self.level_days.append(to_day(date))
+        self.levels.append((
+            self._size, self._code(self.names, self._name_index, stock_name),
+            stop_loss, take_profit,
+        ))
+
+    def snapshot(self, date, positions):
+        self.snapshot_days.append(to_day(date))
+        self.snapshots.append((self._size, len(self.levels), positions_state(positions)))
+
+    def maybe_snapshot(self, date, positions):
+        count, levels, _ = self.snapshots[-1]
+        if self._size - count + len(self.levels) - levels >= self.snapshot_every:
+            self.snapshot(date, positions)
+
+    # ==========================================================
+
+    def __len__(self):
+        return self._size
+
+    def __getitem__(self, i):
+        if i < 0:
+            i += self._size
+        if not 0 <= i < self._size:
+            raise IndexError("Indeks dziennika poza zakresem.")
+        return Transaction(
+            self.names[self._ticker[i]], int(self._shares[i]), float(self._price[i]),
+            from_day(self._day[i]), _TYPES[self._type[i]], self.reasons[self._reason[i]]
+        )
+
+    def __iter__(self):
+        for i in range(self._size):
+            yield self[i]
+
+    def state_at(self, date):
+        # Stan pozycji po wszystkich transakcjach z dnia date włącznie
+        day = to_day(date)
+        k = bisect_right(self.snapshot_days, day) - 1
+        start, first_level, state = self.snapshots[k]
+        positions = {row[0]: list(row[1:]) for row in state}
+
+        end = start + int(np.searchsorted(self._day[start:self._size], day, side="right"))
+        last_level = bisect_right(self.level_days, day, lo=first_level)
+
+        # Zmiana SL / TP zapisana po `count` transakcjach – przed transakcją count
+        i = start
+        for count, ticker, sl, tp in self.levels[first_level:last_level]:
+            self._replay(positions, i, count)
+            i = count
+            row = positions.get(self.names[ticker])
+            if row is not None:
+                row[3], row[4] = sl, tp
+        self._replay(positions, i, end)
+
+        return [(name, *row) for name, row in positions.items()]
+
+    def _replay(self, positions, start, end):
+        for i in range(start, end):
+            name = self.names[self._ticker[i]]
+            shares, price = int(self._shares[i]), float(self._price[i])
+
+            if _TYPES[self._type[i]] == BUY:
+                row = positions.setdefault(name, [0, 0.0, int(self._day[i]), None, None])
+                total = row[0] * row[1] + shares * price
+                row[0] += shares
+                row[1] = total / row[0]
+            else:
+                row = positions[name]
+                row[0] -= shares
+                if row[0] == 0:
+                    del positions[name]
+
+    def until(self, date):
+        # Kopia dziennika z transakcjami i migawkami do dnia date włącznie
+        day = to_day(date)
+        n = int(np.searchsorted(self._day[:self._size], day, side="right"))
+        k = bisect_right(self.snapshot_days, day) - 1
+        m = bisect_right(self.level_days, day)
+
+        meta = self.to_meta()
+        meta["snapshot_days"] = meta["snapshot_days"][:k]
+        meta["snapshots"] = meta["snapshots"][:k]
+        arrays = {
+            key: a[:m] if key.startswith("levels_") else a[:n]
+            for key, a in self.to_arrays().items()
+        }
+        return Ledger.from_saved(arrays, meta)
+
+    # ==========================================================
+
+    def to_arrays(self):
+        count, ticker, sl, tp = zip(*self.levels) if self.levels else ((),) * 4
+        return {
+            "levels_day": np.array(self.level_days, dtype=np.int64),
+            "levels_count": np.array(count, dtype=np.int64),
+            "levels_ticker": np.array(ticker, dtype=np.int32),
+            # None (brak zlecenia) zapisujemy jako NaN
+            "levels_sl": np.array(sl, dtype=np.float64),
+            "levels_tp": np.array(tp, dtype=np.float64),
+            "ledger_day": self._day[:self._size],
+            "ledger_ticker": self._ticker[:self._size],
+            "ledger_shares": self._shares[:self._size],
+            "ledger_price": self._price[:self._size],
+            "ledger_type": self._type[:self._size],
+            "ledger_reason": self._reason[:self._size],
+        }
+
+    def to_meta(self):
+        return {
+            "snapshot_every": self.snapshot_every,
+            "names": self.names,
+            "reasons": self.reasons,
+            "snapshot_days": self.snapshot_days[1:],
+            "snapshots": self.snapshots[1:],
+        }
+
+    @classmethod
+    def from_saved(cls, arrays, meta):
+        ledger = cls(meta["snapshot_every"], capacity=max(len(arrays["ledger_day"]), 64))
+        ledger.names = list(meta["names"])
+        ledger._name_index = {name: i for i, name in enumerate(ledger.names)}
+        ledger.reasons = list(meta["reasons"])
+        ledger._reason_index = {reason: i for i, reason in enumerate(ledger.reasons)}
+
+        n = len(arrays["ledger_day"])
+        ledger._size = n
+        ledger._day[:n] = arrays["ledger_day"]
+        ledger._ticker[:n] = arrays["ledger_ticker"]
+        ledger._shares[:n] = arrays["ledger_shares"]
+        ledger._price[:n] = arrays["ledger_price"]
+        ledger._type[:n] = arrays["ledger_type"]
+        ledger._reason[:n] = arrays["ledger_reason"]
+
+        if "levels_day" in arrays:
+            ledger.level_days = arrays["levels_day"].tolist()
+            ledger.levels = [
+                (count, ticker, _level(sl), _level(tp))
+                for count, ticker, sl, tp in zip(
+                    arrays["levels_count"].tolist(), arrays["levels_ticker"].tolist(),
+                    arrays["levels_sl"].tolist(), arrays["levels_tp"].tolist(),
+                )
+            ]
+
+        # Starsze zapisy: migawki (liczba transakcji, stan) bez zmian SL / TP
+        ledger.snapshot_days += meta["snapshot_days"]
+        ledger.snapshots += [
+            (row[0], row[1] if len(row) == 3 else 0, [tuple(pos) for pos in row[-1]])
+            for row in meta["snapshots"]
+        ]
+        return ledger
+
+
+def _level(value):
+    return None if np.isnan(value) else value
+
+
+def positions_state(positions):
+    # [(nazwa, akcje, średnia cena, dzień pierwszego zakupu, SL, TP), ...]
+    return [
+        (name, pos.shares, pos.avg_price, to_day(pos.first_buy_date), pos.stop_loss, pos.take_profit)
+        for name, pos in positions.items()
+    ]
@@ -0,0 +1,105 @@
+from typing import NamedTuple
+
+
+class PositionSnapshot(NamedTuple):
+    name: str
+    shares: int
+    avg_price: float
+    price: float
+    value: float
+    invested: float
+    stop_loss: float | None
+    take_profit: float | None
+
+
+class ValuationSnapshot(NamedTuple):
+    date: object
+    positions: tuple
+    total_value: float
+    total_invested: float
+
+
+class _Row:
+    __slots__ = ("shares", "avg_price", "price", "value", "invested", "stop_loss", "take_profit")
+
+    def __init__(self):
+        self.shares = 0
+        self.avg_price = 0.0
+        self.price = 0.0
+        self.value = 0.0
+        self.invested = 0.0
+        self.stop_loss = None
+        self.take_profit = None
+
+
+class PortfolioValuation:
+    def __init__(self):
+        self.date = None
+        self.total_value = 0.0
+        self.total_invested = 0.0
+        self._rows = {}
+        self._snapshot = None
+
+    def _replace(self, row, value, invested):
+        self.total_value += value - row.value
+        self.total_invested += invested - row.invested
+        row.value = value
+        row.invested = invested
+        self._snapshot = None
+
+    def set_position(self, name, position, price=None):
+        # Zmiana liczby akcji lub średniej ceny (kupno / sprzedaż części)
+        row = self._rows.get(name)
+        if row is None:
+            row = self._rows[name] = _Row()
+        if price is not None:
+            row.price = price
+
+        row.shares = position.shares
+        row.avg_price = position.avg_price
+        row.stop_loss = position.stop_loss
+        row.take_profit = position.take_profit
+        self._replace(row, row.shares * row.price, row.avg_price * row.shares)
+
+    def update_price(self, name, price):
+        row = self._rows[name]
+        if row.price == price:
+            return
+        row.price = price
+        self._replace(row, row.shares * price, row.invested)
+
+    def remove(self, name):
+        row = self._rows.pop(name, None)
+        if row is None:
+            return
+        self.total_value -= row.value
+        self.total_invested -= row.invested
+        self._snapshot = None
+
+        # Po zamknięciu ostatniej pozycji zerujemy sumy, żeby nie zostawał błąd zaokrągleń
+        if not self._rows:
+            self.total_value = 0.0
+            self.total_invested = 0.0
+
+    def set_date(self, date):
+        self.date = date
+        self._snapshot = None
+
+    def price(self, name):
+        return self._rows[name].price
+
+    def snapshot(self) -> ValuationSnapshot:
+        if self._snapshot is None:
+            self._snapshot = ValuationSnapshot(
+                self.date,
+                tuple(
+                    PositionSnapshot(
+                        name, row.shares, row.avg_price, row.price, row.value,
+                        row.invested, row.stop_loss, row.take_profit
+                    )
+                    for name, row in self._rows.items()
+                ),
+                self.total_value,
+                self.total_invested,
+            )
+        return self._snapshot